@@ -1,12 +1,17 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
 import streamlit as st
-import pandas as pd
 from typing import Optional, Dict, Any, List, Tuple
 
 # Import core components
 from src.database_connector import DatabaseConnector
 # profile_attribute is used within app_logic now
 from src.results_manager import ResultsManager
-from src.clustering_engine import ClusteringEngine
+# NOTE: ClusteringEngine is imported lazily inside get_clustering_engine;
+# it pulls in sklearn/scipy, which noticeably slows Streamlit cold start.
 from src.ui_components import (
     display_db_connection_form,
     display_results_config_ui,
@@ -16,12 +21,74 @@ from src.ui_components import (
     parse_attribute_identifier # Import the moved function
 )
 from src.config_manager import ConfigManager
-from src.app_logic import run_profiling_job # Import the new function
+from src.app_logic import run_profiling_job, clear_profile_cache
 
 # --- Page Configuration ---
 st.set_page_config(layout="wide", page_title="Data Profiler")
 st.title("📊 Data Profiler Tool")
 
+# Required (non-optional) connection fields per database type, precomputed so
+# the validation gates don't rebuild a filtered key set on every click.
+REQUIRED_CONNECTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "postgresql": ("host", "port", "username", "password", "database"),
+    "snowflake": ("account", "username", "password", "warehouse", "database", "schema"),
+}
+
+# Rows of the upload kept in memory for the selection/preview UI when the
+# full data lives in the on-disk Parquet copy
+CSV_PREVIEW_ROWS = 100
+
+def _conn_details_complete(conn_details: Optional[Dict[str, Any]]) -> bool:
+    """True when every required field for the details' db_type is filled in."""
+    if not conn_details:
+        return False
+    required_keys = REQUIRED_CONNECTION_FIELDS.get(conn_details.get("db_type"), ())
+    return all(conn_details.get(k) for k in required_keys)
+
+# --- Cached Resources ---
+# Engines (and the ResultsManager built on top of one) are cached per
+# connection details, so reruns and repeated "Connect" clicks with identical
+# details reuse the pooled connections instead of re-handshaking. A failed
+# connection raises, so failures are NOT cached and a retry works normally.
+@st.cache_resource(show_spinner=False)
+def get_cached_engine(conn_details_json: str):
+    """Creates (and caches) a pooled SQLAlchemy engine from serialized connection details."""
+    engine = DatabaseConnector.create_db_engine(json.loads(conn_details_json))
+    if engine is None:
+        raise ConnectionError("Could not create database engine.")
+    return engine
+
+@st.cache_resource(show_spinner=False)
+def get_cached_results_manager(conn_details_json: str, table_name: str) -> ResultsManager:
+    """Creates (and caches) a ResultsManager backed by a cached engine."""
+    return ResultsManager(get_cached_engine(conn_details_json), table_name=table_name)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_uploaded_csv(upload_key: str, _uploaded_file):
+    """
+    In-memory memoization of the parsed upload, keyed by the uploader's
+    file identity. Sits on top of the on-disk Parquet cache: a rerun that
+    re-triggers the load path returns the cached frame without touching disk.
+    Returns (DataFrame, parquet_path) as produced by read_csv_cached.
+    """
+    return DatabaseConnector.read_csv_cached(_uploaded_file)
+
+def _conn_details_key(conn_details: Dict[str, Any], *extra: str) -> str:
+    """Stable short hash of connection details, used to detect no-op reconnects."""
+    payload = json.dumps(conn_details, sort_keys=True) + "::".join(extra)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+@st.cache_resource(show_spinner=False)
+def get_clustering_engine(_results_manager: ResultsManager, manager_key: str):
+    """Caches the ClusteringEngine per results manager so repeated runs reuse it."""
+    from src.clustering_engine import ClusteringEngine # Deferred: pulls in sklearn
+    return ClusteringEngine(_results_manager)
+
+@st.cache_resource(show_spinner=False)
+def get_background_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for long-running jobs, keeping the render thread free."""
+    return ThreadPoolExecutor(max_workers=2)
+
 # --- Config and State Management ---
 config_manager = ConfigManager() # Initialize once
 # Initialize session state variables if they don't exist
@@ -33,31 +100,75 @@ if 'source_type' not in st.session_state:
     st.session_state.source_type = None # 'database' or 'csv'
 if 'csv_df' not in st.session_state:
     st.session_state.csv_df = None # DataFrame from uploaded CSV
+if 'csv_head_arrow' not in st.session_state:
+    st.session_state.csv_head_arrow = None # Arrow preview of the CSV head
 if 'csv_filename' not in st.session_state:
     st.session_state.csv_filename = None # Store original filename
+if 'csv_parquet_path' not in st.session_state:
+    st.session_state.csv_parquet_path = None # On-disk Parquet copy for column-pruned reads
 if 'profiled_data' not in st.session_state:
     st.session_state.profiled_data = None # List of profile dicts from last run
+if 'profile_success_count' not in st.session_state:
+    st.session_state.profile_success_count = 0 # Successes in the last run
+if 'profile_error_count' not in st.session_state:
+    st.session_state.profile_error_count = 0 # Errors in the last run
 if 'cluster_results' not in st.session_state:
     st.session_state.cluster_results = None # DataFrame of cluster results
-# NEW: List to hold attributes selected for profiling
+if 'cluster_future' not in st.session_state:
+    st.session_state.cluster_future = None # Pending background clustering job
+if 'profiles_version' not in st.session_state:
+    st.session_state.profiles_version = 0 # Bumped whenever new profiles are saved
+if 'clustered_profiles_version' not in st.session_state:
+    st.session_state.clustered_profiles_version = None # Version last clustered
+# NEW: Attributes selected for profiling. A dict used as an ordered set:
+# keys are identifier strings ("schema.table.column" or "csv:filename.column"),
+# giving O(1) add/remove/membership while preserving insertion order.
 if 'attributes_to_profile' not in st.session_state:
-    st.session_state.attributes_to_profile = [] # List of strings: "schema.table.column" or "csv:filename.column"
+    st.session_state.attributes_to_profile = {}
 # Removed file ID tracker as it might be unreliable
 
 # --- Helper Functions ---
 def reset_state():
     """Resets connection and data state."""
     st.session_state.db_engine = None # Keep engine/manager/data in session state
+    st.session_state.db_engine_key = None
     st.session_state.results_manager = None
+    st.session_state.results_manager_key = None
     st.session_state.source_type = None
     st.session_state.csv_df = None
+    st.session_state.csv_head_arrow = None
     st.session_state.csv_filename = None # Reset filename
+    st.session_state.csv_parquet_path = None
+    st.session_state.csv_row_count = None
     st.session_state.profiled_data = None
+    st.session_state.profile_success_count = 0
+    st.session_state.profile_error_count = 0
     st.session_state.cluster_results = None
-    st.session_state.attributes_to_profile = []
+    st.session_state.attributes_to_profile = {}
     config_manager.clear_all_config() # Clear config stored via manager
-    # Potentially clear specific config inputs as well
-    st.rerun()
+    # Drop cached engines/managers and memoized metadata so a fresh session
+    # really starts fresh
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    # The identifier helpers keep small lru_caches; clear them too so the
+    # caches can't grow without bound across many sessions
+    from src.ui_components import format_attribute_identifier, format_csv_attribute_identifier
+    format_attribute_identifier.cache_clear()
+    format_csv_attribute_identifier.cache_clear()
+    parse_attribute_identifier.cache_clear()
+    clear_profile_cache() # Content-keyed profile memo in app_logic
+    # No explicit st.rerun(): the reset button's own click already triggers a
+    # rerun, so forcing a second full render here would just double the work.
+
+def _on_source_type_change():
+    """Clears the attribute list only when the source type actually changed.
+
+    Named callback (not a per-rerun lambda) so a radio interaction that
+    re-emits the same value doesn't wipe the user's selections.
+    """
+    if st.session_state.source_choice != st.session_state.get("_prev_source_choice"):
+        st.session_state.attributes_to_profile = {}
+    st.session_state._prev_source_choice = st.session_state.source_choice
 
 # --- Sidebar: Configuration ---
 with st.sidebar:
@@ -65,7 +176,7 @@ with st.sidebar:
 
     # --- Source Data Connection ---
     st.subheader("1. Source Data")
-    source_type = st.radio("Select Source Type", ["Database", "CSV"], key="source_choice", horizontal=True, on_change=lambda: st.session_state.update(attributes_to_profile=[])) # Reset list on source type change
+    source_type = st.radio("Select Source Type", ["Database", "CSV"], key="source_choice", horizontal=True, on_change=_on_source_type_change) # Reset list on actual source type change
 
     conn_details_source: Optional[Dict[str, Any]] = None
     uploaded_file = None
@@ -75,30 +186,52 @@ with st.sidebar:
         # Use the UI component to display the form
         # Load defaults from config manager
         conn_defaults_source = config_manager.load_connection_details("source")
-        conn_details_source = display_db_connection_form(
-            config_key_prefix="src",
-            defaults=conn_defaults_source
+        src_db_types = ["postgresql", "snowflake"]
+        # The type selector stays outside the form: it decides which credential
+        # fields render, so it must rerun immediately on change.
+        src_db_type = st.selectbox(
+            "Database Type",
+            src_db_types,
+            key="src_db_type",
+            index=src_db_types.index(conn_defaults_source.get("db_type", src_db_types[0])) if conn_defaults_source else 0,
         )
+        # Batch the credential inputs: editing a field no longer reruns the
+        # whole script; a single rerun happens on submit.
+        with st.form("src_conn_form"):
+            conn_details_source = display_db_connection_form(
+                config_key_prefix="src",
+                defaults=conn_defaults_source,
+                db_type=src_db_type,
+            )
+            submitted_source = st.form_submit_button("Connect to Source DB")
 
-        if st.button("Connect to Source DB", key="connect_source"):
+        if submitted_source:
             # Reset attribute list on new connection attempt
-            st.session_state.attributes_to_profile = []
+            st.session_state.attributes_to_profile = {}
             # Check completeness within the app logic before connecting
-            required_keys_source = set(conn_details_source.keys()) - {'db_type', 'role'} if conn_details_source else set()
-            if conn_details_source and all(conn_details_source.get(k) for k in required_keys_source):
-                with st.spinner("Connecting to source database..."):
-                    # Save attempted details before connecting
-                    config_manager.save_connection_details("source", conn_details_source)
-                    engine = DatabaseConnector.create_db_engine(conn_details_source)
-                    if engine:
-                        st.session_state.db_engine = engine
-                        st.success("Connected to Source DB!")
-                        # Clear potentially stale results connection details, but keep table name
-                        config_manager.save_connection_details("results", None)
-                        # REMOVED: config_manager.save_results_table_name("") # Ensure this line is commented/removed
-                    else:
-                        st.error("Connection Failed. Check details and logs.")
-                        st.session_state.db_engine = None
+            if _conn_details_complete(conn_details_source):
+                # Skip the whole connect path when the details are identical
+                # to the live connection - no handshake, no config rewrite.
+                source_key = _conn_details_key(conn_details_source)
+                if st.session_state.db_engine is not None and source_key == st.session_state.get("db_engine_key"):
+                    st.info("Already connected to the source database with these details.")
+                else:
+                    with st.spinner("Connecting to source database..."):
+                        # Save attempted details before connecting
+                        config_manager.save_connection_details("source", conn_details_source)
+                        try:
+                            st.session_state.db_engine = get_cached_engine(
+                                json.dumps(conn_details_source, sort_keys=True)
+                            )
+                            st.session_state.db_engine_key = source_key
+                            st.success("Connected to Source DB!")
+                            # Clear potentially stale results connection details, but keep table name
+                            config_manager.save_connection_details("results", None)
+                            # REMOVED: config_manager.save_results_table_name("") # Ensure this line is commented/removed
+                        except Exception:
+                            st.error("Connection Failed. Check details and logs.")
+                            st.session_state.db_engine = None
+                            st.session_state.db_engine_key = None
             else:
                  st.warning("Please fill in all required connection details.")
 
@@ -111,20 +244,41 @@ with st.sidebar:
             # Only reload and clear list if df is None OR filename changed
             if st.session_state.csv_df is None or uploaded_file.name != st.session_state.csv_filename:
                 st.session_state.csv_filename = uploaded_file.name
-                st.session_state.attributes_to_profile = [] # Clear list ONLY on NEW/CHANGED upload
+                st.session_state.attributes_to_profile = {} # Clear list ONLY on NEW/CHANGED upload
                 with st.spinner("Loading CSV..."):
                     try:
-                        df = DatabaseConnector.read_csv(uploaded_file)
+                        upload_key = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+                        df, parquet_path = load_uploaded_csv(upload_key, uploaded_file)
                         if df is not None:
-                            st.session_state.csv_df = df
-                            st.success(f"Loaded {uploaded_file.name} ({len(df)} rows)")
+                            # Row count captured once at load; reruns reuse it
+                            st.session_state.csv_row_count = len(df)
+                            # Kept so the profiler can read single columns from
+                            # disk instead of scanning the full frame
+                            st.session_state.csv_parquet_path = parquet_path
+                            if parquet_path:
+                                # Full data lives on disk: hold only a preview
+                                # in session state, not the whole frame
+                                st.session_state.csv_df = df.head(CSV_PREVIEW_ROWS)
+                            else:
+                                st.session_state.csv_df = df
+                            # Serialize the preview rows to Arrow once per
+                            # upload; st.dataframe accepts the table directly,
+                            # skipping a pandas->Arrow conversion per rerun.
+                            st.session_state.csv_head_arrow = pa.Table.from_pandas(
+                                st.session_state.csv_df.head()
+                            )
+                            st.success(f"Loaded {uploaded_file.name} ({st.session_state.csv_row_count} rows)")
                         else:
                             st.error("Failed to read CSV file.")
                             st.session_state.csv_df = None
+                            st.session_state.csv_head_arrow = None
+                            st.session_state.csv_parquet_path = None
                             st.session_state.csv_filename = None # Reset filename on load fail
                     except Exception as e:
                         st.error(f"Error loading CSV: {e}")
                         st.session_state.csv_df = None
+                        st.session_state.csv_head_arrow = None
+                        st.session_state.csv_parquet_path = None
                         st.session_state.csv_filename = None # Reset filename on load fail
         # else: # File is the same as already loaded, do nothing to preserve state
         else:
@@ -132,39 +286,50 @@ with st.sidebar:
             if st.session_state.csv_filename is not None: # Only clear if there *was* a file
                  st.session_state.csv_filename = None
                  st.session_state.csv_df = None
-                 st.session_state.attributes_to_profile = [] # Clear list if file removed
+                 st.session_state.csv_head_arrow = None
+                 st.session_state.csv_parquet_path = None
+                 st.session_state.attributes_to_profile = {} # Clear list if file removed
 
 
     # --- Results Database Connection ---
     # Load source details from config manager to pass to UI component
     loaded_conn_details_source = config_manager.load_connection_details("source")
     # Use the UI component to display the results config section
-    conn_details_results_form, results_table_name_form = display_results_config_ui(
+    conn_details_results_form, results_table_name_form, submitted_results = display_results_config_ui(
         source_conn_details=loaded_conn_details_source, # Pass loaded source details
         source_is_db=(st.session_state.source_type == "database")
     )
 
-    if st.button("Connect to Results DB", key="connect_results"):
+    if submitted_results:
         # Check completeness before connecting
-        required_keys_results = set(conn_details_results_form.keys()) - {'db_type', 'role'} if conn_details_results_form else set()
-        if conn_details_results_form and all(conn_details_results_form.get(k) for k in required_keys_results):
-            with st.spinner("Connecting to results database..."):
-                # Save attempted details before connecting
-                config_manager.save_connection_details("results", conn_details_results_form)
-                config_manager.save_results_table_name(results_table_name_form) # Save name from form
-                engine = DatabaseConnector.create_db_engine(conn_details_results_form) # Use the details from the form logic
-                if engine:
+        if _conn_details_complete(conn_details_results_form):
+            # Table name participates in the key: same DB but a different
+            # results table still needs a fresh manager.
+            results_key = _conn_details_key(conn_details_results_form, results_table_name_form)
+            if st.session_state.results_manager is not None and results_key == st.session_state.get("results_manager_key"):
+                st.info("Already connected to the results database with these details.")
+            else:
+                with st.spinner("Connecting to results database..."):
+                    # Save attempted details before connecting
+                    config_manager.save_connection_details("results", conn_details_results_form)
+                    config_manager.save_results_table_name(results_table_name_form) # Save name from form
                     try:
                         # Use the saved table name when initializing
                         current_results_table_name = config_manager.load_results_table_name()
-                        st.session_state.results_manager = ResultsManager(engine, table_name=current_results_table_name)
+                        st.session_state.results_manager = get_cached_results_manager(
+                            json.dumps(conn_details_results_form, sort_keys=True),
+                            current_results_table_name,
+                        )
+                        st.session_state.results_manager_key = results_key
                         st.success("Connected to Results DB & Manager initialized!")
+                    except ConnectionError:
+                        st.error("Connection Failed. Check details and logs.")
+                        st.session_state.results_manager = None
+                        st.session_state.results_manager_key = None
                     except Exception as e:
                          st.error(f"Failed to initialize Results Manager: {e}")
                          st.session_state.results_manager = None
-                else:
-                    st.error("Connection Failed. Check details and logs.")
-                    st.session_state.results_manager = None
+                         st.session_state.results_manager_key = None
         else:
              st.warning("Please fill in all required connection details.")
 
@@ -181,91 +346,180 @@ with st.sidebar:
 display_attribute_selection()
 # The component modifies st.session_state.attributes_to_profile directly
 
-# --- Display Selected Attributes ---
-st.header("📋 Attributes Selected for Profiling")
-# Check if the list exists and has items
-attributes_exist = 'attributes_to_profile' in st.session_state and st.session_state.attributes_to_profile
-if attributes_exist:
-    with st.expander("View/Edit List", expanded=True):
-        attributes_to_remove = []
-        for i, attr_id in enumerate(st.session_state.attributes_to_profile):
-            col1, col2 = st.columns([0.9, 0.1])
-            col1.write(f"- `{attr_id}`")
-            if col2.button("❌", key=f"remove_{i}", help="Remove attribute"):
-                attributes_to_remove.append(attr_id)
-
-        if attributes_to_remove:
-            st.session_state.attributes_to_profile = [
-                attr for attr in st.session_state.attributes_to_profile if attr not in attributes_to_remove
-            ]
-            # st.rerun() # Keep commented out
-else:
-    st.info("Select attributes from a data source and add them to the list to enable profiling.")
-
-# --- Profiling Execution ---
-st.header("🚀 Run Profiling")
-# Render the button always, but disable if no attributes are selected
-profiling_disabled = not attributes_exist # Disable if list is empty or doesn't exist
-if st.button("Start Profiling Listed Attributes", key="start_profiling_list", disabled=profiling_disabled):
-    # Allow profiling even without results manager, but warn about saving
-    can_save = st.session_state.results_manager is not None
-    if not can_save:
-         st.warning("Results Database not connected. Profiles will be displayed but not saved.")
-try:
-    # Capture the list state *immediately* after entering the button block
-    # Use .copy() to ensure we have an independent list
-    attributes_to_process = st.session_state.get('attributes_to_profile', []).copy()
- 
-    if not attributes_to_process: # Add extra check here
+def _handle_profile_click():
+    """
+    Runs the profiling job for the listed attributes. Called only from the
+    Start Profiling button handler: previously this body sat in a mis-indented
+    try block at module level and re-executed on every rerun.
+    """
+    try:
+        # Snapshot the dict keys so we work on an independent list
+        attributes_to_process = list(st.session_state.get('attributes_to_profile', {}))
+
+        if not attributes_to_process: # Add extra check here
             st.warning("Attribute list is empty. Cannot start profiling.")
-    else:
-        successful_profiles, error_list = run_profiling_job(
-            attributes_to_process, # Use the captured list
-            st.session_state.results_manager # Pass manager (can be None)
-        )
-        # Store successful profiles in session state for display
-        st.session_state.profiled_data = successful_profiles
-        # Display errors collected from the job if any
-        if error_list:
+        else:
+            successful_profiles, error_list = run_profiling_job(
+                attributes_to_process, # Use the captured list
+                st.session_state.results_manager # Pass manager (can be None)
+            )
+            # Store successful profiles in session state for display, with
+            # counts so the results display never re-scans the list
+            st.session_state.profiled_data = successful_profiles
+            st.session_state.profile_success_count = len(successful_profiles)
+            st.session_state.profile_error_count = len(error_list)
+            # New profiles invalidate any feature matrix cached by the clustering engine
+            st.session_state.profiles_version += 1
+            # Display errors collected from the job if any
+            if error_list:
                 with st.expander("View Profiling Errors"):
                     # Display errors more clearly
                     for err in error_list:
                         st.error(f"Error profiling `{err.get('attribute_name', 'Unknown')}`: {err.get('error', 'Unknown error')}")
-
-        # st.rerun()
-except Exception as e:
+    except Exception as e:
         st.error(f"An unexpected error occurred in the button click handler: {e}")
 
 
-# --- Display Profiling Results ---
-# Use the UI component
-display_profiling_results()
-
-
-# --- Clustering Execution & Results ---
-# Use the UI component for display, keep button logic here
-display_clustering_results()
-
-# Clustering button logic remains here as it triggers backend processing
-if st.session_state.results_manager:
-    if st.button("Run Clustering on All Stored Profiles", key="start_clustering_main"):
-        with st.spinner("Running clustering analysis..."):
-            try:
-                clustering_engine = ClusteringEngine(st.session_state.results_manager)
-                # Get threshold from the input within display_clustering_results
-                distance_threshold = st.session_state.get("dist_thresh", 5.0) # Get threshold from input widget state
-                cluster_results_df = clustering_engine.perform_clustering(distance_threshold=distance_threshold)
-                if cluster_results_df is not None:
-                    st.session_state.cluster_results = cluster_results_df # Store results for display component
-                    st.success(f"Clustering complete. Found {cluster_results_df['cluster_id'].nunique()} clusters.")
-                    st.rerun() # Rerun to update the display component
-                else:
-                    st.error("Clustering failed. Check logs or profile data.")
+@st.fragment
+def profiling_section():
+    """
+    Attribute list, profiling trigger, and results display. Runs as a
+    fragment: interactions here (remove buttons, the profiling button) rerun
+    only this section instead of the whole script, so the sidebar connection
+    logic and source metadata calls are not re-executed.
+    """
+    # --- Display Selected Attributes ---
+    st.header("📋 Attributes Selected for Profiling")
+    # Check if the list exists and has items
+    attributes_exist = 'attributes_to_profile' in st.session_state and st.session_state.attributes_to_profile
+    if attributes_exist:
+        with st.expander("View/Edit List", expanded=True):
+            import pandas as pd # Already loaded by the UI components; no extra cost
+
+            # One data_editor for the whole list instead of a widget trio per
+            # attribute: widget count per rerun stays constant no matter how
+            # many attributes are listed, and removal is a vectorized diff
+            list_df = pd.DataFrame({
+                "attribute": list(st.session_state.attributes_to_profile),
+                "remove": False,
+            })
+            edited_df = st.data_editor(
+                list_df,
+                num_rows="fixed",
+                disabled=["attribute"],
+                hide_index=True,
+                key="attr_list_editor",
+            )
+            if st.button("Remove Selected", key="remove_selected_attrs"):
+                # Dict-backed store: each removal is an O(1) pop by key, and the
+                # dict itself guarantees no duplicate identifiers can accumulate
+                for attr_id in edited_df.loc[edited_df["remove"], "attribute"]:
+                    st.session_state.attributes_to_profile.pop(attr_id, None)
+                # Drop the widget state so the editor doesn't hold edits for
+                # rows that no longer exist after the rerun
+                st.session_state.pop("attr_list_editor", None)
+                st.rerun(scope="fragment") # Redraw the list without the removed entries
+    else:
+        st.info("Select attributes from a data source and add them to the list to enable profiling.")
+
+    # --- Profiling Execution ---
+    st.header("🚀 Run Profiling")
+    # Render the button always, but disable if no attributes are selected
+    profiling_disabled = not attributes_exist # Disable if list is empty or doesn't exist
+    if st.button("Start Profiling Listed Attributes", key="start_profiling_list", disabled=profiling_disabled):
+        # Allow profiling even without results manager, but warn about saving
+        can_save = st.session_state.results_manager is not None
+        if not can_save:
+             st.warning("Results Database not connected. Profiles will be displayed but not saved.")
+        _handle_profile_click()
+
+    # --- Display Profiling Results ---
+    # Use the UI component
+    display_profiling_results()
+
+
+# Poll interval for a pending clustering job. Evaluated on every full script
+# run, so the fragment timer below only exists while a job is in flight;
+# otherwise the section renders once and stays idle. Driving the poll with
+# run_every (instead of sleep + st.rerun(scope="fragment") inside the body)
+# keeps full app runs from stalling on the sleep, and avoids the
+# StreamlitAPIException a fragment-scoped rerun raises when the body executes
+# as part of a full script run.
+_cluster_poll_interval = 0.5 if st.session_state.cluster_future is not None else None
+
+@st.fragment(run_every=_cluster_poll_interval)
+def clustering_section():
+    """
+    Clustering controls and results. As a fragment, the background-job
+    polling reruns stay scoped to this section instead of re-executing the
+    whole script twice a second while clustering runs.
+    """
+    # Outcome of the last clustering run, stashed across the app rerun that
+    # disarms the poll timer (same flash pattern as the Add Columns handlers).
+    flash = st.session_state.pop("_clustering_flash", None)
+    if flash:
+        level, message = flash
+        (st.success if level == "success" else st.error)(message)
+
+    # Use the UI component for display, keep button logic here
+    display_clustering_results()
+
+    # Clustering button logic remains here as it triggers backend processing.
+    # The clustering run is submitted to a background worker so the UI stays
+    # responsive; each rerun polls the pending future until it completes.
+    if st.session_state.results_manager:
+        clustering_running = st.session_state.cluster_future is not None
+        if st.button("Run Clustering on All Stored Profiles", key="start_clustering_main", disabled=clustering_running):
+            results_manager = st.session_state.results_manager
+            manager_key = f"{results_manager.engine.url}::{results_manager.table_name}"
+            clustering_engine = get_clustering_engine(results_manager, manager_key)
+            # Reuse the prepared feature matrix when no profiles were saved since
+            # the last run (i.e. the user is only trying a different threshold)
+            reuse_prepared = (st.session_state.clustered_profiles_version == st.session_state.profiles_version)
+            st.session_state.clustered_profiles_version = st.session_state.profiles_version
+            # Get threshold from the input within display_clustering_results
+            distance_threshold = st.session_state.get("dist_thresh", 5.0) # Get threshold from input widget state
+            st.session_state.cluster_future = get_background_executor().submit(
+                clustering_engine.perform_clustering,
+                distance_threshold=distance_threshold,
+                reuse_prepared=reuse_prepared,
+            )
+            # Full rerun re-evaluates _cluster_poll_interval, arming the
+            # fragment's run_every timer that polls the future
+            st.rerun(scope="app")
+
+        cluster_future = st.session_state.cluster_future
+        if cluster_future is not None:
+            if cluster_future.done():
+                st.session_state.cluster_future = None
+                try:
+                    cluster_results_df = cluster_future.result()
+                    if cluster_results_df is not None:
+                        st.session_state.cluster_results = cluster_results_df # Store results for display component
+                        # Cluster count comes back as frame metadata from the
+                        # engine; no extra nunique() pass over the column
+                        n_clusters = cluster_results_df.attrs.get('n_clusters', cluster_results_df['cluster_id'].nunique())
+                        st.session_state["_clustering_flash"] = ("success", f"Clustering complete. Found {n_clusters} clusters.")
+                    else:
+                        st.session_state["_clustering_flash"] = ("error", "Clustering failed. Check logs or profile data.")
+                        st.session_state.cluster_results = None
+                except Exception as e:
+                    st.session_state["_clustering_flash"] = ("error", f"An error occurred during clustering: {e}")
                     st.session_state.cluster_results = None
-            except Exception as e:
-                st.error(f"An error occurred during clustering: {e}")
-                st.session_state.cluster_results = None
-# The display_clustering_results function handles showing the info message if no manager exists.
+                # Disarm the poll timer and redraw with the outcome; the flash
+                # stored above survives this rerun
+                st.rerun(scope="app")
+            else:
+                st.info("Clustering running in the background... the rest of the app remains usable.")
+                # No explicit rerun here: the run_every timer fires the next poll
+    # The display_clustering_results function handles showing the info message if no manager exists.
+
+
+# --- Profiling Section (fragment) ---
+profiling_section()
+
+# --- Clustering Execution & Results (fragment) ---
+clustering_section()
 
 
 # --- Footer or Status Bar ---
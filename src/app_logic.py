@@ -1,66 +1,192 @@
+import hashlib
+import threading
+import time
+import pandas as pd
 import streamlit as st
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional, Tuple # Added Tuple
 
 # Import necessary components and functions
 from src.database_connector import DatabaseConnector
-from src.profiling_engine import profile_attribute
+from src.profiling_engine import profile_attribute, profile_attribute_streaming
 from src.results_manager import ResultsManager
 # Import parse_attribute_identifier (assuming it's now in ui_components or a utils file)
 # Let's assume it's accessible or redefine if needed. For now, import from ui_components.
 from src.ui_components import parse_attribute_identifier
 
+# Profiles are flushed to the results DB in batches of this size during a run
+SAVE_CHUNK_SIZE = 100
 
-def _profile_single_listed_attribute(identifier: str) -> Optional[Dict[str, Any]]:
+# Attribute profiling is mostly I/O-bound (DB sample queries), so a modest
+# thread pool lets several fetches overlap on the shared connection pool.
+PROFILE_MAX_WORKERS = 8
+
+# Above this sample size, table columns are profiled from a chunked cursor
+# (profile_attribute_streaming) so peak memory holds one chunk instead of
+# the whole materialized sample.
+STREAMING_SAMPLE_THRESHOLD = 20000
+
+# Content-keyed memo for profile_attribute: re-profiling an attribute whose
+# sampled data hasn't changed (e.g. re-running after a threshold tweak) is a
+# dict lookup instead of a full metrics pass. Bounded LRU, thread-safe.
+PROFILE_CACHE_MAX = 1024
+_profile_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+
+def clear_profile_cache():
+    """Empties the content-keyed profile memo (called from the reset button)."""
+    with _profile_cache_lock:
+        _profile_cache.clear()
+
+
+def _cached_profile_attribute(data_series: pd.Series, identifier: str) -> Optional[Dict[str, Any]]:
     """
-    Fetches data and profiles a single attribute based on its identifier.
-    (Moved from app.py)
+    profile_attribute with a content-hash memo. The key hashes the series
+    values (dtype-agnostic via hash_pandas_object) plus the identifier, so a
+    hit requires identical data — new samples of the same attribute miss.
     """
-    parsed_id = parse_attribute_identifier(identifier)
-    profile = None
+    try:
+        digest = hashlib.blake2b(
+            pd.util.hash_pandas_object(data_series, index=False).to_numpy().tobytes(),
+            digest_size=16,
+        ).hexdigest()
+    except Exception:
+        return profile_attribute(data_series, identifier) # Unhashable: just compute
+    key = (identifier, digest)
+    with _profile_cache_lock:
+        cached = _profile_cache.get(key)
+        if cached is not None:
+            _profile_cache.move_to_end(key)
+            return dict(cached) # Shallow copy: callers annotate the dict
+    profile = profile_attribute(data_series, identifier)
+    if profile:
+        with _profile_cache_lock:
+            _profile_cache[key] = dict(profile)
+            if len(_profile_cache) > PROFILE_CACHE_MAX:
+                _profile_cache.popitem(last=False)
+    return profile
+
+
+def _profile_csv_column(identifier: str, column: Optional[str], csv_df,
+                        csv_parquet_path=None, csv_row_count=None) -> Optional[Dict[str, Any]]:
+    """
+    Profiles one CSV column. The column name is parsed once by the caller and
+    passed in, so worker tasks don't re-split the identifier string.
+
+    The frame and Parquet path are passed in explicitly (resolved once by the
+    caller) so this function is safe to run from worker threads that have no
+    Streamlit script-run context. When the on-disk Parquet copy of the upload
+    is available, the column is read from it individually (columnar,
+    column-pruned) instead of sliced from the full in-memory frame.
+    """
+    if csv_df is None:
+        raise FileNotFoundError("CSV data not loaded.")
+    if not column or column not in csv_df.columns:
+        raise ValueError(f"Column '{column}' not found in loaded CSV.")
+
     data_series = None
+    if csv_parquet_path:
+        try:
+            # Column-pruned read: Parquet is columnar, so this touches
+            # only the requested column's pages on disk
+            data_series = pd.read_parquet(csv_parquet_path, columns=[column])[column]
+        except Exception:
+            data_series = None # Fall back to the in-memory frame
+    if data_series is None:
+        # The in-memory frame may hold only a preview when a Parquet copy
+        # exists; refuse to silently profile the truncated data.
+        if csv_row_count is not None and len(csv_df) < csv_row_count:
+            raise ValueError(
+                f"Full CSV data unavailable for column '{column}': the Parquet "
+                "copy could not be read and only a preview is in memory."
+            )
+        data_series = csv_df[column]
 
-    # Ensure necessary state exists before proceeding
-    db_engine = st.session_state.get('db_engine')
-    csv_df = st.session_state.get('csv_df')
- 
-    if parsed_id["type"] == "db" and db_engine:
-        schema = parsed_id["schema"]
-        table = parsed_id["table"]
-        column = parsed_id["column"]
-        if table and column:
-            # Fetch data ONLY for the specific column
-            # TODO: Optimize by fetching one sample per table needed.
+    # Use the identifier as the attribute name for the profile dict
+    profile = _cached_profile_attribute(data_series, identifier)
+    if profile:
+        profile['attribute_name'] = identifier # Ensure identifier is the name
+    return profile
+
+
+def _profile_table_group(schema: Optional[str], table: str,
+                         identifier_columns: List[Tuple[str, str]],
+                         db_engine, sample_size: int = 10000) -> List[Dict[str, Any]]:
+    """
+    Fetches ONE sample for a table and profiles every requested column from it.
+
+    Columns that share a table previously each re-fetched their own 10k-row
+    sample; grouping cuts DB round-trips from one per column to one per table.
+    Returns one dict per identifier — a profile on success, or a dict with an
+    'error' key on failure — so the caller keeps per-attribute granularity.
+
+    Above STREAMING_SAMPLE_THRESHOLD the sample is not materialized: each
+    column is profiled from its own chunked cursor, trading the shared
+    per-table fetch (and the single-pass-only metric set) for bounded memory.
+    """
+    results: List[Dict[str, Any]] = []
+    if sample_size > STREAMING_SAMPLE_THRESHOLD:
+        for identifier, column in identifier_columns:
+            try:
+                chunks = DatabaseConnector.iter_table_sample(
+                    db_engine, table, schema, sample_size=sample_size, columns=[column]
+                )
+                if chunks is None:
+                    results.append({"attribute_name": identifier,
+                                    "error": f"Sample failed for {schema}.{table}."})
+                    continue
+                profile = profile_attribute_streaming(
+                    (chunk[column] for chunk in chunks), identifier)
+                if profile:
+                    results.append(profile)
+                else:
+                    results.append({"attribute_name": identifier,
+                                    "error": "Profiling returned None (empty sample?)"})
+            except Exception as e:
+                results.append({"attribute_name": identifier, "error": str(e)})
+        return results
+
+    df_sample = None
+    # Project only the requested columns: wide tables don't ship unprofiled
+    # columns over the wire (dict preserves order while deduplicating)
+    wanted_columns = list(dict.fromkeys(column for _, column in identifier_columns))
+    try:
+        df_sample = DatabaseConnector.get_table_sample(
+            db_engine, table, schema, sample_size=sample_size,
+            columns=wanted_columns,
+        )
+        if df_sample is None:
+            # A stale/missing column fails the whole projected query; retry
+            # unprojected so the remaining columns still profile
             df_sample = DatabaseConnector.get_table_sample(
-                db_engine, table, schema, sample_size=10000 # Configurable?
+                db_engine, table, schema, sample_size=sample_size
             )
-            if df_sample is not None and column in df_sample.columns:
-                data_series = df_sample[column]
-            else:
-                raise ValueError(f"Column '{column}' not found in sample or sample failed for {schema}.{table}.")
-        else:
-             raise ValueError(f"Could not parse DB identifier correctly: {identifier}")
-
-    elif parsed_id["type"] == "csv" and csv_df is not None:
-        column = parsed_id["column"]
-        if column and column in csv_df.columns:
-            data_series = csv_df[column]
-        else:
-            raise ValueError(f"Column '{column}' not found in loaded CSV.")
+    except Exception as e:
+        fetch_error = str(e)
     else:
-        # Raise error if required state (db_engine/csv_df) is missing for the identifier type
-        if parsed_id["type"] == "db" and not db_engine:
-             raise ConnectionError("Database connection not available.")
-        elif parsed_id["type"] == "csv" and csv_df is None:
-             raise FileNotFoundError("CSV data not loaded.")
-        else:
-             raise ValueError(f"Cannot profile attribute: Invalid type or missing data/connection for {identifier}")
+        fetch_error = None if df_sample is not None else f"Sample failed for {schema}.{table}."
 
-    if data_series is not None:
-        # Use the identifier as the attribute name for the profile dict
-        profile = profile_attribute(data_series, identifier)
-        if profile:
-             profile['attribute_name'] = identifier # Ensure identifier is the name
-    return profile
+    for identifier, column in identifier_columns:
+        if fetch_error is not None:
+            results.append({"attribute_name": identifier, "error": fetch_error})
+            continue
+        if column not in df_sample.columns:
+            results.append({"attribute_name": identifier,
+                            "error": f"Column '{column}' not found in sample for {schema}.{table}."})
+            continue
+        try:
+            profile = _cached_profile_attribute(df_sample[column], identifier)
+            if profile:
+                profile['attribute_name'] = identifier
+                results.append(profile)
+            else:
+                results.append({"attribute_name": identifier,
+                                "error": "Profiling returned None (unsupported type?)"})
+        except Exception as e:
+            results.append({"attribute_name": identifier, "error": str(e)})
+    return results
 
 
 def run_profiling_job(
@@ -86,37 +212,136 @@ def run_profiling_job(
     profiles = []
     errors = []
 
-    for i, identifier in enumerate(attributes_to_profile):
-        status_text.text(f"Profiling attribute {i+1}/{total_attributes}: `{identifier}`")
-        try:
-            profile = _profile_single_listed_attribute(identifier)
-            if profile:
-                profiles.append(profile)
+    # Resolve session state once on the main thread; worker threads have no
+    # Streamlit context and must not touch st.session_state themselves.
+    db_engine = st.session_state.get('db_engine')
+    csv_df = st.session_state.get('csv_df')
+    csv_parquet_path = st.session_state.get('csv_parquet_path')
+    csv_row_count = st.session_state.get('csv_row_count')
+
+    # Parse every identifier exactly once, up front: the grouping below and
+    # the worker tasks both consume the parsed (identifier, column) tuples, so
+    # no identifier string is re-split inside the hot loop. DB identifiers
+    # are grouped by table so each table's sample is fetched once and shared
+    # by all of its requested columns; CSV identifiers stay per-attribute
+    # (column-pruned local reads are already cheap).
+    db_groups: Dict[Tuple[Optional[str], str], List[Tuple[str, str]]] = defaultdict(list)
+    csv_columns: List[Tuple[str, Optional[str]]] = [] # (identifier, column)
+    unparseable: List[Dict[str, Any]] = []
+    for identifier in attributes_to_profile:
+        parsed_id = parse_attribute_identifier(identifier)
+        if parsed_id["type"] == "db":
+            if parsed_id["table"] and parsed_id["column"]:
+                db_groups[(parsed_id["schema"], parsed_id["table"])].append((identifier, parsed_id["column"]))
             else:
-                # Handle case where profile function returns None (e.g., unsupported type)
-                errors.append({"attribute_name": identifier, "error": "Profiling returned None (unsupported type?)"})
-        except Exception as e:
-            # Use st.error for immediate feedback in the UI during the loop
-            st.error(f"Failed to get data or profile '{identifier}': {e}")
-            errors.append({"attribute_name": identifier, "error": str(e)})
+                unparseable.append({"attribute_name": identifier,
+                                    "error": f"Could not parse DB identifier correctly: {identifier}"})
+        elif parsed_id["type"] == "csv":
+            csv_columns.append((identifier, parsed_id.get("column")))
+        else:
+            # parse_attribute_identifier returns {"type": "unknown"} for
+            # malformed identifiers; degrade those to error rows instead of
+            # letting a KeyError abort the whole run.
+            unparseable.append({"attribute_name": identifier,
+                                "error": f"Could not parse attribute identifier: {identifier}"})
+
+    def _profile_and_collect():
+        """
+        Profiles the attributes on a thread pool, yielding every result
+        (success or error) as it completes so the caller can stream them to
+        the results DB while other attributes are still in flight. All st.*
+        updates happen here on the main thread.
+        """
+        completed = 0
+        # Throttle frontend updates: each progress/status call is a WebSocket
+        # message, so cap them at ~1% steps or 10 Hz instead of per attribute.
+        update_step = max(1, total_attributes // 100)
+        last_update = 0.0
 
-        # Update progress bar
-        progress_bar.progress((i + 1) / total_attributes)
+        def _record(result: Dict[str, Any]):
+            nonlocal completed, last_update
+            completed += 1
+            identifier = result.get("attribute_name", "Unknown")
+            now = time.monotonic()
+            if completed % update_step == 0 or now - last_update > 0.1 or completed == total_attributes:
+                last_update = now
+                status_text.text(f"Profiled attribute {completed}/{total_attributes}: `{identifier}`")
+                # Update progress bar by identifiers completed, not queries issued
+                progress_bar.progress(completed / total_attributes)
+            if "error" in result:
+                # Errors are collected and rendered once after the run; a
+                # per-error st.error here would add a full component render
+                # (and a WebSocket message) per failing attribute.
+                errors.append(result)
+            else:
+                profiles.append(result)
+            return result
+
+        for error in unparseable:
+            yield _record(error)
+
+        if db_groups and db_engine is None:
+            for identifier_columns in db_groups.values():
+                for identifier, _ in identifier_columns:
+                    yield _record({"attribute_name": identifier,
+                                   "error": "Database connection not available."})
+
+        task_count = (len(db_groups) if db_engine is not None else 0) + len(csv_columns)
+        if task_count == 0:
+            return
+        with ThreadPoolExecutor(max_workers=min(PROFILE_MAX_WORKERS, task_count)) as executor:
+            futures = []
+            if db_engine is not None:
+                futures.extend(
+                    executor.submit(_profile_table_group, schema, table, identifier_columns, db_engine)
+                    for (schema, table), identifier_columns in db_groups.items()
+                )
+            csv_future_map = {
+                executor.submit(_profile_csv_column, identifier, column, csv_df, csv_parquet_path, csv_row_count): identifier
+                for identifier, column in csv_columns
+            }
+            futures.extend(csv_future_map)
+            for future in as_completed(futures):
+                if future in csv_future_map:
+                    identifier = csv_future_map[future]
+                    try:
+                        profile = future.result()
+                        if profile:
+                            yield _record(profile)
+                        else:
+                            # Handle case where profile function returns None (e.g., unsupported type)
+                            yield _record({"attribute_name": identifier,
+                                           "error": "Profiling returned None (unsupported type?)"})
+                    except Exception as e:
+                        yield _record({"attribute_name": identifier, "error": str(e)})
+                else:
+                    # Table-group task: one sample fetch, many per-column results
+                    for result in future.result():
+                        yield _record(result)
+
+    if results_manager:
+        # Streaming save: results flush to the DB in fixed-size chunks as the
+        # generator produces them, instead of one big batch at the very end.
+        results_manager.save_profiles_stream(_profile_and_collect(), chunk_size=SAVE_CHUNK_SIZE)
+    else:
+        for _ in _profile_and_collect():
+            pass # No manager: just drive the profiling loop
 
+    progress_bar.progress(1.0) # Final update even if the throttle skipped some
     status_text.text("Profiling run complete.")
     st.success(f"Profiled {len(profiles)} attributes successfully.")
     if errors:
         st.warning(f"Encountered errors for {len(errors)} attributes.")
-        # Optionally display errors in an expander in the main app later
-        # with st.expander("View Errors"):
-        #     st.json([e['error'] for e in errors])
+        # One collapsed table for all failures instead of a st.error per
+        # attribute during the loop
+        with st.expander("View Errors"):
+            errors_df = pd.DataFrame(errors)
+            display_cols = [c for c in ("attribute_name", "error") if c in errors_df.columns]
+            st.dataframe(errors_df[display_cols] if display_cols else errors_df,
+                         hide_index=True)
 
-    # Save results (including errors) only if manager is available
     if results_manager and (profiles or errors):
-        with st.spinner("Saving results to database..."):
-            all_results_to_save = profiles + errors
-            results_manager.save_profiles(all_results_to_save)
-            st.success("Results (including errors) saved successfully.")
+        st.success("Results (including errors) saved successfully.")
     elif not results_manager and (profiles or errors):
         st.info("Profiling complete. Results not saved as database is not connected.")
 
@@ -1,28 +1,67 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Dict, List, Optional, Protocol, Tuple
 import warnings
 
-# Import ResultsManager to interact with profile data
-from src.results_manager import ResultsManager
+# scipy/sklearn are imported lazily inside the functions that need them:
+# pulling them in at module scope costs several hundred ms of cold start on
+# every Streamlit run that touches this module, clustering or not. After the
+# first call sys.modules makes the function-level imports free.
+
+
+class ResultsManagerLike(Protocol):
+    """
+    The slice of ResultsManager this engine actually uses.
+
+    Typing against the protocol (instead of importing ResultsManager, which
+    drags the SQLAlchemy stack in at module import time) keeps this module
+    cheap to import and lets tests pass a lightweight stand-in.
+    """
+
+    def get_all_profiles(self) -> pd.DataFrame: ...
+
+    def update_cluster_id(self, attribute_name: str, cluster_id: int) -> None: ...
+
+    def bulk_update_cluster_ids(self, cluster_mapping: Dict[str, int]) -> None: ...
+
+# Above this many attributes, ward clustering's O(N^2) distance matrix gets
+# expensive; switch to MiniBatchKMeans with a ward-estimated cluster count.
+LARGE_N_THRESHOLD = 2000
+KMEANS_PROBE_SIZE = 1000
+
+
+def _ward_cut_labels(data: np.ndarray, distance_threshold: float) -> np.ndarray:
+    """
+    Hierarchical ward labels via scipy's condensed-distance pipeline.
+
+    pdist stores only the N(N-1)/2 condensed distances (half the square
+    matrix sklearn's estimator materializes) computed from float32 input,
+    and linkage/fcluster cut at the same distance threshold the UI exposes.
+    Labels are shifted to start at 0 to match the previous output contract.
+    """
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import pdist
+
+    condensed = pdist(np.ascontiguousarray(data, dtype=np.float32))
+    Z = linkage(condensed, method='ward')
+    return fcluster(Z, t=distance_threshold, criterion='distance') - 1
 
 
 class ClusteringEngine:
     """Performs clustering on profiled attribute data."""
 
-    def __init__(self, results_manager: ResultsManager):
+    def __init__(self, results_manager: ResultsManagerLike):
         """
         Initializes the ClusteringEngine.
 
         Args:
-            results_manager: An instance of ResultsManager to get profile data
-                             and update cluster IDs.
+            results_manager: An object providing ResultsManager's profile
+                             retrieval and cluster-update methods (see
+                             ResultsManagerLike).
         """
-        if not isinstance(results_manager, ResultsManager):
-            raise TypeError("results_manager must be an instance of ResultsManager.")
+        for method in ("get_all_profiles", "bulk_update_cluster_ids"):
+            if not callable(getattr(results_manager, method, None)):
+                raise TypeError(f"results_manager must provide a callable '{method}' method.")
         self.results_manager = results_manager
 
         # Define the features to be used for clustering based on PROJECT_PLAN.md
@@ -42,6 +81,12 @@ class ClusteringEngine:
         ]
         # Note: Selection of features might need refinement based on results
 
+        # Cached (scaled matrix, attribute names) from the last preparation,
+        # so re-clustering with a different threshold can skip the profile
+        # refetch and scaling passes.
+        self._prepared_matrix = None
+        self._prepared_names: Optional[List[str]] = None
+
     def _prepare_data_for_clustering(self, df: pd.DataFrame) -> Tuple[Optional[pd.DataFrame], Optional[List[str]]]:
         """
         Selects features, handles missing values, and scales data.
@@ -58,13 +103,15 @@ class ClusteringEngine:
             warnings.warn("Missing 'attribute_name' column in profile data. Cannot perform clustering.", UserWarning)
             return None, None
 
-        # Filter out profiles with errors if an 'error' column exists and is not null
+        # Filter out profiles with errors if an 'error' column exists and is
+        # not null. The mask selection already returns a new frame and nothing
+        # below writes to it, so no defensive .copy() is needed.
         if 'error' in df.columns:
-            df_valid = df[df['error'].isnull()].copy()
+            df_valid = df[df['error'].isnull()]
             if len(df_valid) < len(df):
                  warnings.warn(f"Excluded {len(df) - len(df_valid)} profiles with errors from clustering.", UserWarning)
         else:
-            df_valid = df.copy()
+            df_valid = df
 
         if df_valid.empty:
             warnings.warn("No valid profiles available for clustering.", UserWarning)
@@ -76,28 +123,35 @@ class ClusteringEngine:
             warnings.warn("None of the specified clustering features found in the profile data.", UserWarning)
             return None, None
 
-        data_to_cluster = df_valid[['attribute_name'] + features_present].copy()
+        attribute_names = df_valid['attribute_name'].tolist()
 
-        # Convert boolean flags to numeric (0/1)
-        for col in ['is_ssn_candidate', 'is_dob_candidate']:
-            if col in data_to_cluster.columns:
-                # Fill NA before converting to int, then bool, then int (0/1)
-                data_to_cluster[col] = data_to_cluster[col].fillna(False).astype(bool).astype(int)
+        # Materialize ONE float32 feature array, coerced column by column into
+        # preallocated C-order storage. The previous flow built an
+        # intermediate frame copy, wrote coerced columns back into it, and
+        # then copied again into an ndarray — two full matrix copies that this
+        # layout skips. Row-major float32 also keeps the downstream
+        # imputer/scaler/linkage passes reading sequential half-width rows.
+        feature_array = np.empty((len(df_valid), len(features_present)), dtype=np.float32, order='C')
+        for j, col in enumerate(features_present):
+            feature_array[:, j] = pd.to_numeric(df_valid[col], errors='coerce').to_numpy(dtype=np.float32)
 
-        # Separate attribute names and feature matrix
-        attribute_names = data_to_cluster['attribute_name'].tolist()
-        feature_matrix = data_to_cluster[features_present].copy() # Use .copy() to avoid SettingWithCopyWarning
-
-        # --- Ensure all feature columns are numeric before imputation ---
-        for col in features_present:
-            feature_matrix[col] = pd.to_numeric(feature_matrix[col], errors='coerce')
+        # Boolean flags: a missing flag means "not detected", so map NaN to 0
+        # in-place rather than letting the median imputer invent a value.
+        for col in ('is_ssn_candidate', 'is_dob_candidate'):
+            if col in features_present:
+                np.nan_to_num(feature_array[:, features_present.index(col)], copy=False, nan=0.0)
 
         # Handle missing values (imputation) - Now operating on a purely numeric (or NaN) matrix
         # Using median imputation as a robust strategy for skewed distributions
+        from sklearn.impute import SimpleImputer
+        from sklearn.preprocessing import StandardScaler
+
         try:
+            # Count the missing cells once, before the imputer runs its own
+            # pass; count_nonzero over the mask avoids a reduction temporary.
+            n_imputed = int(np.count_nonzero(np.isnan(feature_array)))
             imputer = SimpleImputer(strategy='median')
-            imputed_matrix = imputer.fit_transform(feature_matrix)
-            n_imputed = np.isnan(feature_matrix.values).sum()
+            imputed_matrix = imputer.fit_transform(feature_array)
             if n_imputed > 0:
                  warnings.warn(f"Imputed {n_imputed} missing values using median strategy.", UserWarning)
         except Exception as e:
@@ -116,29 +170,39 @@ class ClusteringEngine:
         return scaled_matrix, attribute_names
 
 
-    def perform_clustering(self, distance_threshold: float = 5.0) -> Optional[pd.DataFrame]:
+    def perform_clustering(self, distance_threshold: float = 5.0, reuse_prepared: bool = False) -> Optional[pd.DataFrame]:
         """
         Performs hierarchical clustering on the profile data.
 
         Args:
             distance_threshold: The linkage distance threshold above which clusters
                                 will not be merged. Controls the number of clusters.
+            reuse_prepared: If True and a prepared feature matrix exists from a
+                            previous run, skip refetching/rescaling the profiles
+                            and only recompute the cluster cut. Use when no new
+                            profiles were saved since the last run.
 
         Returns:
             DataFrame with attribute names and assigned cluster IDs, or None if clustering fails.
         """
         print("Starting clustering process...")
-        profile_df = self.results_manager.get_all_profiles()
+        if reuse_prepared and self._prepared_matrix is not None:
+            print("Reusing prepared feature matrix from previous run.")
+            scaled_data, attribute_names = self._prepared_matrix, self._prepared_names
+        else:
+            profile_df = self.results_manager.get_all_profiles()
 
-        if profile_df.empty:
-            warnings.warn("No profile data found to perform clustering.", UserWarning)
-            return None
+            if profile_df.empty:
+                warnings.warn("No profile data found to perform clustering.", UserWarning)
+                return None
 
-        scaled_data, attribute_names = self._prepare_data_for_clustering(profile_df)
+            scaled_data, attribute_names = self._prepare_data_for_clustering(profile_df)
 
-        if scaled_data is None or attribute_names is None:
-            warnings.warn("Data preparation failed. Aborting clustering.", UserWarning)
-            return None
+            if scaled_data is None or attribute_names is None:
+                warnings.warn("Data preparation failed. Aborting clustering.", UserWarning)
+                return None
+
+            self._prepared_matrix, self._prepared_names = scaled_data, attribute_names
             
         if len(scaled_data) < 2:
              warnings.warn("Need at least 2 data points to perform clustering. Aborting.", UserWarning)
@@ -146,44 +210,55 @@ class ClusteringEngine:
              if len(scaled_data) == 1:
                  self.results_manager.update_cluster_id(attribute_names[0], 0)
                  print("Assigned cluster 0 to the single attribute.")
-                 return pd.DataFrame({'attribute_name': attribute_names, 'cluster_id': [0]})
+                 results_df = pd.DataFrame({'attribute_name': attribute_names, 'cluster_id': [0]})
+                 results_df.attrs['n_clusters'] = 1
+                 return results_df
              return None
 
 
-        print(f"Performing Agglomerative Clustering on {len(scaled_data)} attributes using {scaled_data.shape[1]} features...")
         try:
-            # Perform clustering
-            # Using n_clusters=None and distance_threshold
-            model = AgglomerativeClustering(
-                n_clusters=None,
-                distance_threshold=distance_threshold,
-                linkage='ward' # Minimizes variance within clusters; implicitly uses Euclidean distance
-            )
-            cluster_labels = model.fit_predict(scaled_data)
+            if len(scaled_data) >= LARGE_N_THRESHOLD:
+                # Ward clustering materializes an O(N^2) distance matrix; for
+                # large attribute counts switch to MiniBatchKMeans (linear in
+                # N). The cluster count k is estimated by ward-cutting a small
+                # subsample at the same distance threshold, keeping the
+                # threshold semantics the UI exposes.
+                print(f"Performing MiniBatchKMeans on {len(scaled_data)} attributes using {scaled_data.shape[1]} features...")
+                from sklearn.cluster import MiniBatchKMeans
+                rng = np.random.default_rng(0)
+                probe_idx = rng.choice(len(scaled_data), size=KMEANS_PROBE_SIZE, replace=False)
+                probe_labels = _ward_cut_labels(scaled_data[probe_idx], distance_threshold)
+                n_clusters_estimate = max(1, len(set(probe_labels)))
+                model = MiniBatchKMeans(
+                    n_clusters=n_clusters_estimate,
+                    batch_size=1024,
+                    n_init='auto',
+                    random_state=0,
+                )
+                cluster_labels = model.fit_predict(scaled_data)
+            else:
+                print(f"Performing hierarchical (ward) clustering on {len(scaled_data)} attributes using {scaled_data.shape[1]} features...")
+                # Ward minimizes within-cluster variance (euclidean distance);
+                # the condensed pdist pipeline avoids the full N x N matrix
+                cluster_labels = _ward_cut_labels(scaled_data, distance_threshold)
             n_clusters_found = len(set(cluster_labels))
             print(f"Clustering complete. Found {n_clusters_found} clusters with distance threshold {distance_threshold}.")
 
-            # Update results table with cluster IDs
+            # Update results table with cluster IDs in one batched statement
+            # instead of one UPDATE round trip per attribute
             print("Updating results table with cluster IDs...")
-            updates_failed = 0
-            for attr_name, cluster_id in zip(attribute_names, cluster_labels):
-                try:
-                    self.results_manager.update_cluster_id(attr_name, int(cluster_id))
-                except Exception as e:
-                     warnings.warn(f"Failed to update cluster ID for {attr_name}: {e}", UserWarning)
-                     updates_failed += 1
-            
-            if updates_failed > 0:
-                 warnings.warn(f"Failed to update cluster IDs for {updates_failed} attributes.", UserWarning)
-            else:
-                 print("Successfully updated all cluster IDs.")
+            self.results_manager.bulk_update_cluster_ids(
+                dict(zip(attribute_names, map(int, cluster_labels)))
+            )
 
 
-            # Return results
+            # Return results. The cluster count is attached as frame metadata
+            # so callers don't re-scan the column with nunique() for display.
             results_df = pd.DataFrame({
                 'attribute_name': attribute_names,
                 'cluster_id': cluster_labels
             })
+            results_df.attrs['n_clusters'] = n_clusters_found
             return results_df
 
         except Exception as e:
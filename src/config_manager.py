@@ -1,41 +1,68 @@
 import streamlit as st
+from dataclasses import dataclass, replace
 from typing import Optional, Dict, Any
 
-# Define keys for session state storage
-SRC_CONN_KEY = "config_source_connection"
-RES_CONN_KEY = "config_results_connection"
-RES_TABLE_KEY = "config_results_table_name"
+# Single session-state key holding the whole configuration snapshot
+CONFIG_KEY = "app_config"
 DEFAULT_TABLE_NAME = "data_profiler_results"
 
+
+@dataclass(frozen=True)
+class AppConfig:
+    """
+    Immutable snapshot of the application configuration.
+
+    Frozen so a handed-out snapshot can never be mutated behind the UI's
+    back; writes go through dataclasses.replace, which builds a new snapshot.
+    """
+    src_conn: Optional[Dict[str, Any]] = None
+    res_conn: Optional[Dict[str, Any]] = None
+    table_name: str = DEFAULT_TABLE_NAME
+
+
 class ConfigManager:
     """
-    Manages application configuration using Streamlit's session state.
+    Manages application configuration as a single AppConfig snapshot in
+    Streamlit's session state.
+
+    One snapshot under one key means each read does a single session-state
+    lookup plus attribute access, instead of a per-field get; clearing is one
+    pop instead of a del loop over key names.
     (Note: This implementation does not persist config across app restarts.)
     """
 
+    @staticmethod
+    def _get() -> AppConfig:
+        """Returns the current snapshot, or a default one if none is stored."""
+        config = st.session_state.get(CONFIG_KEY)
+        return config if config is not None else AppConfig()
+
+    @staticmethod
+    def _set(**changes) -> None:
+        """Stores a new snapshot with the given fields replaced."""
+        st.session_state[CONFIG_KEY] = replace(ConfigManager._get(), **changes)
+
     def save_connection_details(self, config_type: str, details: Optional[Dict[str, Any]]):
-        """Saves connection details to session state."""
-        key = SRC_CONN_KEY if config_type == "source" else RES_CONN_KEY
-        st.session_state[key] = details
+        """Saves connection details to the config snapshot."""
+        field = "src_conn" if config_type == "source" else "res_conn"
+        self._set(**{field: details})
 
     def load_connection_details(self, config_type: str) -> Optional[Dict[str, Any]]:
-        """Loads connection details from session state."""
-        key = SRC_CONN_KEY if config_type == "source" else RES_CONN_KEY
-        return st.session_state.get(key, None)
+        """Loads connection details from the config snapshot."""
+        config = self._get()
+        return config.src_conn if config_type == "source" else config.res_conn
 
     def save_results_table_name(self, table_name: str):
-        """Saves the results table name to session state."""
-        st.session_state[RES_TABLE_KEY] = table_name
+        """Saves the results table name to the config snapshot."""
+        self._set(table_name=table_name)
 
     def load_results_table_name(self) -> str:
-        """Loads the results table name from session state."""
-        return st.session_state.get(RES_TABLE_KEY, DEFAULT_TABLE_NAME)
+        """Loads the results table name from the config snapshot."""
+        return self._get().table_name
 
     def clear_all_config(self):
-        """Clears stored configuration from session state."""
-        for key in [SRC_CONN_KEY, RES_CONN_KEY, RES_TABLE_KEY]:
-            if key in st.session_state:
-                del st.session_state[key]
+        """Clears the stored configuration snapshot from session state."""
+        st.session_state.pop(CONFIG_KEY, None)
         print("Cleared configuration from session state.")
 
 # Example usage (not run directly, but shows intent)
@@ -48,4 +75,4 @@ class ConfigManager:
 #     res_details = manager.load_connection_details("results")
 #     # Example: Saving table name
 #     manager.save_results_table_name("my_profile_results")
-#     table_name = manager.load_results_table_name()
\ No newline at end of file
+#     table_name = manager.load_results_table_name()
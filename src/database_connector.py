@@ -1,15 +1,50 @@
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from weakref import WeakKeyDictionary
+
 import pandas as pd
 import sqlalchemy as sa
 from sqlalchemy.engine import URL, Engine
+from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy.exc import SQLAlchemyError
 import warnings
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+# Directory for the content-addressed Parquet cache of parsed CSV uploads
+CSV_PARQUET_CACHE_DIR = os.path.join(tempfile.gettempdir(), "dataprofiler_parquet_cache")
+
+# Chunk size used when spooling uploads to disk (bounds the buffer delta)
+UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Above this size, the C-engine fallback reads the CSV in row chunks
+LARGE_CSV_BYTES = 100_000_000
+LARGE_CSV_CHUNK_ROWS = 500_000
+
+# Sample reads at or above this many rows use server-side cursors
+STREAM_RESULTS_MIN_ROWS = 20_000
+
+# One Inspector per engine: get_schemas/get_tables/get_columns used to call
+# sa.inspect(engine) each, so a single schema->table->column navigation paid
+# for three Inspector setups. Weak keys let the entry die with the engine.
+_inspector_cache: "WeakKeyDictionary[Engine, Inspector]" = WeakKeyDictionary()
+
+
+def _get_inspector(engine: Engine) -> Inspector:
+    """Returns a cached Inspector for the engine, creating it on first use."""
+    inspector = _inspector_cache.get(engine)
+    if inspector is None:
+        inspector = _inspector_cache[engine] = sa.inspect(engine)
+    return inspector
+
 
 class DatabaseConnector:
     """Handles database connections and basic data retrieval."""
 
     @staticmethod
-    def create_db_engine(conn_details: Dict[str, Any]) -> Optional[Engine]:
+    def create_db_engine(conn_details: Dict[str, Any],
+                         engine_options: Optional[Dict[str, Any]] = None) -> Optional[Engine]:
         """
         Creates a SQLAlchemy engine based on connection details.
 
@@ -21,6 +56,9 @@ class DatabaseConnector:
                           - 'host', 'port', 'database' (for postgresql)
                           - 'account', 'warehouse', 'database', 'schema' (for snowflake)
                           - Optional: 'role' (for snowflake)
+            engine_options: Optional create_engine keyword overrides, merged
+                            over the default pool settings (e.g. to disable
+                            pool_pre_ping on an already-tuned server).
 
         Returns:
             A SQLAlchemy Engine object or None if connection fails.
@@ -28,6 +66,22 @@ class DatabaseConnector:
         db_type = conn_details.get("db_type")
         engine = None
 
+        # Explicit pool sizing: the app issues many small queries (metadata,
+        # samples, result upserts), and pooled connections avoid paying the
+        # TCP/TLS handshake per query. pool_pre_ping guards against stale
+        # connections after idle periods; pool_recycle caps connection age.
+        # pool_timeout bounds how long a checkout waits for a free connection
+        # when the pool is saturated, instead of queueing indefinitely.
+        pool_kwargs = {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_timeout": 30,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        }
+        if engine_options:
+            pool_kwargs.update(engine_options)
+
         try:
             if db_type == "postgresql":
                 url = URL.create(
@@ -38,7 +92,16 @@ class DatabaseConnector:
                     port=conn_details.get("port"),
                     database=conn_details.get("database"),
                 )
-                engine = sa.create_engine(url)
+                # values_plus_batch keeps psycopg2's multi-row VALUES rewrite
+                # for INSERT executemany and additionally batches UPDATE/
+                # DELETE executemany (e.g. cluster-id fallbacks) with
+                # execute_batch, collapsing per-row round trips.
+                pg_kwargs = {
+                    "executemany_mode": "values_plus_batch",
+                    "insertmanyvalues_page_size": 1000,
+                    **pool_kwargs,
+                }
+                engine = sa.create_engine(url, **pg_kwargs)
                 # Test connection
                 with engine.connect() as connection:
                     print(f"Successfully connected to PostgreSQL: {conn_details.get('database')}")
@@ -54,7 +117,7 @@ class DatabaseConnector:
                     schema=conn_details.get("schema"),
                     role=conn_details.get("role"), # Optional
                 )
-                engine = sa.create_engine(url)
+                engine = sa.create_engine(url, **pool_kwargs)
                 # Test connection
                 with engine.connect() as connection:
                     print(f"Successfully connected to Snowflake: {conn_details.get('database')}.{conn_details.get('schema')}")
@@ -79,7 +142,7 @@ class DatabaseConnector:
     def get_schemas(engine: Engine) -> List[str]:
         """Gets a list of accessible schemas (excluding system schemas)."""
         try:
-            inspector = sa.inspect(engine)
+            inspector = _get_inspector(engine)
             schemas = inspector.get_schema_names()
             # Filter out common system schemas
             system_schemas = {'information_schema', 'pg_catalog', 'pg_toast'} # Add more if needed
@@ -93,7 +156,7 @@ class DatabaseConnector:
     def get_tables(engine: Engine, schema: Optional[str] = None) -> List[str]:
         """Gets a list of tables within a specific schema."""
         try:
-            inspector = sa.inspect(engine)
+            inspector = _get_inspector(engine)
             return inspector.get_table_names(schema=schema)
         except SQLAlchemyError as e:
             warnings.warn(f"Error retrieving tables for schema '{schema}': {e}")
@@ -103,14 +166,58 @@ class DatabaseConnector:
     def get_columns(engine: Engine, table_name: str, schema: Optional[str] = None) -> List[Dict[str, Any]]:
         """Gets column names and types for a specific table."""
         try:
-            inspector = sa.inspect(engine)
+            inspector = _get_inspector(engine)
             return inspector.get_columns(table_name, schema=schema)
         except SQLAlchemyError as e:
             warnings.warn(f"Error retrieving columns for table '{schema}.{table_name}': {e}")
             return []
 
     @staticmethod
-    def get_table_sample(engine: Engine, table_name: str, schema: Optional[str] = None, sample_size: int = 1000, is_random: bool = True) -> Optional[pd.DataFrame]:
+    def _introspection_workers(engine: Engine, task_count: int) -> int:
+        """Caps metadata thread-pool size at the engine's connection pool."""
+        try:
+            pool_size = engine.pool.size()
+        except Exception:
+            pool_size = 5 # SQLAlchemy's default pool size
+        return max(1, min(8, task_count, pool_size))
+
+    @staticmethod
+    def get_all_tables(engine: Engine, schemas: List[str]) -> Dict[str, List[str]]:
+        """
+        Gets table lists for several schemas in one bounded parallel pass.
+
+        Introspection is latency-bound I/O, so enumerating N schemas serially
+        costs N round trips; a small thread pool overlaps them into roughly
+        one. Workers are capped at the engine's pool size so metadata queries
+        never exhaust the connection pool.
+        """
+        if not schemas:
+            return {}
+        workers = DatabaseConnector._introspection_workers(engine, len(schemas))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda s: DatabaseConnector.get_tables(engine, s), schemas)
+            return dict(zip(schemas, results))
+
+    @staticmethod
+    def get_all_columns(engine: Engine,
+                        tables: List[Tuple[Optional[str], str]]) -> Dict[Tuple[Optional[str], str], List[Dict[str, Any]]]:
+        """
+        Gets column metadata for several (schema, table) pairs in parallel.
+
+        Same bounded-pool pattern as get_all_tables, for callers that need to
+        enumerate columns across many tables at once.
+        """
+        if not tables:
+            return {}
+        workers = DatabaseConnector._introspection_workers(engine, len(tables))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda st: DatabaseConnector.get_columns(engine, st[1], st[0]), tables)
+            return dict(zip(tables, results))
+
+    @staticmethod
+    def get_table_sample(engine: Engine, table_name: str, schema: Optional[str] = None, sample_size: int = 1000, is_random: bool = True,
+                         columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
         """
         Retrieves a sample of data from a table into a Pandas DataFrame.
 
@@ -120,32 +227,67 @@ class DatabaseConnector:
             schema: Schema of the table (optional).
             sample_size: Number of rows to sample.
             is_random: Whether to perform random sampling (can be slower).
+            columns: Optional list of column names to project; only these are
+                     fetched instead of SELECT *, cutting bytes over the wire
+                     on wide tables.
 
         Returns:
             A Pandas DataFrame containing the sample, or None on error.
         """
         full_table_name = f"{schema}.{table_name}" if schema else table_name
+        dialect = engine.dialect.name
+        if columns:
+            preparer = engine.dialect.identifier_preparer
+            select_list = ", ".join(preparer.quote(col) for col in columns)
+        else:
+            select_list = "*"
+        # Arrow-backed columns make later df[column] slices zero-copy views
+        # instead of potential BlockManager copies on mixed-dtype samples.
+        read_kwargs: Dict[str, Any] = {"dtype_backend": "pyarrow"}
+
+        # For large samples, server-side cursors (stream_results) stop the
+        # driver from buffering the whole result client-side before pandas
+        # materializes it — roughly halving peak memory for the read. Small
+        # samples skip it: a named cursor costs an extra round trip.
+        stream = sample_size >= STREAM_RESULTS_MIN_ROWS
+
+        def _read(sql_query, query_params):
+            with engine.connect().execution_options(stream_results=stream) as conn:
+                return pd.read_sql(sql_query, conn, params=query_params, **read_kwargs)
+
         try:
             if is_random:
-                # Random sampling can be database-specific and potentially slow
-                # Using TABLESAMPLE BERNOULLI for broader compatibility (if supported)
-                # Fallback to LIMIT if TABLESAMPLE fails or isn't needed
+                # Push random sampling to the server where the dialect supports
+                # it, so rows beyond the sample are never scanned or shipped.
+                params: Dict[str, Any] = {'n': sample_size}
+                if dialect == "postgresql":
+                    # TABLESAMPLE SYSTEM picks whole pages: fast but approximate.
+                    # LIMIT stays on as the hard cap on rows returned.
+                    query = sa.text(f"SELECT {select_list} FROM {full_table_name} TABLESAMPLE SYSTEM (1) LIMIT :n")
+                elif dialect == "snowflake":
+                    # Snowflake supports row-count sampling directly.
+                    query = sa.text(f"SELECT {select_list} FROM {full_table_name} SAMPLE ({int(sample_size)} ROWS)")
+                    params = {}
+                else:
+                    query = sa.text(f"SELECT {select_list} FROM {full_table_name} LIMIT :n")
                 try:
-                    # Note: TABLESAMPLE syntax varies (e.g., SYSTEM vs BERNOULLI)
-                    # This is a guess; might need adjustment per DB
-                    query = sa.text(f"SELECT * FROM {full_table_name} TABLESAMPLE SYSTEM (1) LIMIT :n") 
-                    # Adjust percentage based on sample_size and estimated table size if possible
-                    # For simplicity, using LIMIT as a fallback / primary method for now
-                    query = sa.text(f"SELECT * FROM {full_table_name} LIMIT :n")
-                    df = pd.read_sql(query, engine, params={'n': sample_size})
-
-                except SQLAlchemyError: # Fallback if TABLESAMPLE fails
-                     warnings.warn("TABLESAMPLE failed or not supported, using simple LIMIT.")
-                     query = sa.text(f"SELECT * FROM {full_table_name} LIMIT :n")
-                     df = pd.read_sql(query, engine, params={'n': sample_size})
+                    df = _read(query, params)
+                    if len(df) < sample_size and dialect == "postgresql":
+                        # TABLESAMPLE SYSTEM (1) keeps ~1% of pages, so on
+                        # small and mid-sized tables it legally returns far
+                        # fewer rows than requested (or none at all); fall
+                        # back to LIMIT rather than report a short sample.
+                        # Tables genuinely smaller than sample_size just pay
+                        # one cheap extra query for the same rows.
+                        query = sa.text(f"SELECT {select_list} FROM {full_table_name} LIMIT :n")
+                        df = _read(query, {'n': sample_size})
+                except SQLAlchemyError: # e.g. TABLESAMPLE on a view, or an old server version
+                     warnings.warn("Server-side sampling failed or not supported, using simple LIMIT.")
+                     query = sa.text(f"SELECT {select_list} FROM {full_table_name} LIMIT :n")
+                     df = _read(query, {'n': sample_size})
             else:
-                 query = sa.text(f"SELECT * FROM {full_table_name} LIMIT :n")
-                 df = pd.read_sql(query, engine, params={'n': sample_size})
+                 query = sa.text(f"SELECT {select_list} FROM {full_table_name} LIMIT :n")
+                 df = _read(query, {'n': sample_size})
 
             print(f"Successfully sampled {len(df)} rows from {full_table_name}")
             return df
@@ -157,10 +299,86 @@ class DatabaseConnector:
             return None
 
 
+    @staticmethod
+    def iter_table_sample(engine: Engine, table_name: str, schema: Optional[str] = None,
+                          sample_size: int = 1000, columns: Optional[List[str]] = None,
+                          chunksize: int = 2000):
+        """
+        Iterates over a table sample in DataFrame chunks instead of
+        materializing the whole sample at once.
+
+        Peak memory is bounded to O(chunksize x columns) regardless of
+        sample_size, at the cost of the consumer having to accumulate its
+        statistics incrementally (see profile_attribute_streaming). Sampling
+        is a plain LIMIT: the server-side TABLESAMPLE variants don't compose
+        with chunked cursors on every dialect.
+
+        Returns:
+            An iterator of DataFrames, or None if the query fails to start.
+        """
+        full_table_name = f"{schema}.{table_name}" if schema else table_name
+        if columns:
+            preparer = engine.dialect.identifier_preparer
+            select_list = ", ".join(preparer.quote(col) for col in columns)
+        else:
+            select_list = "*"
+        query = sa.text(f"SELECT {select_list} FROM {full_table_name} LIMIT :n")
+        try:
+            # Chunked reads only bound memory if the driver also streams: on a
+            # plain engine psycopg2 buffers the full result client-side before
+            # the first chunk is yielded. Hold a dedicated connection with
+            # stream_results (server-side cursor) open for the iteration and
+            # close it once the consumer is done.
+            connection = engine.connect().execution_options(stream_results=True)
+            try:
+                reader = pd.read_sql(query, connection, params={'n': sample_size},
+                                     chunksize=chunksize, dtype_backend="pyarrow")
+            except (SQLAlchemyError, pd.errors.DatabaseError):
+                connection.close()
+                raise
+        except (SQLAlchemyError, pd.errors.DatabaseError) as e:
+            warnings.warn(f"Error streaming sample from table '{full_table_name}': {e}")
+            return None
+
+        def _chunks():
+            try:
+                yield from reader
+            finally:
+                connection.close()
+
+        return _chunks()
+
     @staticmethod
     def read_csv(file_path: str, **kwargs) -> Optional[pd.DataFrame]:
-        """Reads a CSV file into a Pandas DataFrame."""
+        """Reads a CSV file into a Pandas DataFrame, preferring the pyarrow engine."""
         try:
+            if "engine" not in kwargs:
+                try:
+                    # pyarrow's multithreaded tokenizer is much faster on wide
+                    # or type-varied CSVs; fall back below if it is unavailable
+                    # or the file trips one of its stricter parse paths.
+                    df = pd.read_csv(file_path, engine="pyarrow", **kwargs)
+                    print(f"Successfully read CSV (pyarrow engine): {file_path}")
+                    return df
+                except (ImportError, ValueError, TypeError, pd.errors.ParserError):
+                    if hasattr(file_path, "seek"):
+                        file_path.seek(0)  # Rewind file-like objects before retrying
+                # C-engine fallback: skip the low_memory chunked type inference
+                # and cache repeated date strings during parsing.
+                kwargs.setdefault("low_memory", False)
+                kwargs.setdefault("cache_dates", True)
+                # For very large files the C engine is read in row chunks so
+                # peak memory holds one chunk plus the assembled frame instead
+                # of the parser's full intermediate buffers.
+                try:
+                    file_bytes = os.path.getsize(file_path) if isinstance(file_path, str) else 0
+                except OSError:
+                    file_bytes = 0
+                if file_bytes > LARGE_CSV_BYTES:
+                    with pd.read_csv(file_path, chunksize=LARGE_CSV_CHUNK_ROWS, **kwargs) as reader:
+                        df = pd.concat(reader, ignore_index=True)
+                    print(f"Successfully read large CSV in chunks: {file_path}")
+                    return df
             df = pd.read_csv(file_path, **kwargs)
             print(f"Successfully read CSV: {file_path}")
             return df
@@ -171,6 +389,83 @@ class DatabaseConnector:
             warnings.warn(f"Error reading CSV file '{file_path}': {e}")
             return None
 
+    @staticmethod
+    def _spool_upload_to_disk(uploaded_file) -> Tuple[str, str]:
+        """
+        Streams an uploaded file to a temporary file in fixed-size chunks,
+        hashing the content along the way. Keeps the extra in-memory buffer
+        bounded to one chunk instead of a second full copy of the upload.
+
+        Returns:
+            A tuple of (temp file path, hex content hash).
+        """
+        hasher = hashlib.sha1()
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+            while True:
+                chunk = uploaded_file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                tmp.write(chunk)
+            return tmp.name, hasher.hexdigest()
+
+    @staticmethod
+    def read_csv_cached(uploaded_file) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        Reads an uploaded CSV with a content-addressed Parquet cache.
+
+        The upload is first spooled to disk in chunks (avoiding a second full
+        in-memory copy of the raw bytes) and the parsed frame is persisted to
+        a Parquet file keyed by the content hash, so re-uploading the same
+        file (or a Streamlit rerun that re-triggers the load) skips the CSV
+        parse entirely and pays only the much cheaper Parquet read.
+
+        The Parquet path is returned alongside the frame so callers can do
+        column-pruned reads later (pd.read_parquet(path, columns=[...]))
+        instead of re-scanning the full in-memory frame per attribute.
+
+        Args:
+            uploaded_file: A Streamlit UploadedFile (or any binary file-like
+                           object supporting read/seek).
+
+        Returns:
+            A tuple of (DataFrame, parquet_path). Either element may be None:
+            the frame on read error, the path when spooling/caching failed.
+        """
+        tmp_path = None
+        cache_path = None
+        try:
+            try:
+                tmp_path, file_hash = DatabaseConnector._spool_upload_to_disk(uploaded_file)
+                os.makedirs(CSV_PARQUET_CACHE_DIR, exist_ok=True)
+                cache_path = os.path.join(CSV_PARQUET_CACHE_DIR, f"{file_hash}.parquet")
+                if os.path.exists(cache_path):
+                    df = pd.read_parquet(cache_path)
+                    print(f"Loaded Parquet cache for upload (hash {file_hash[:8]})")
+                    return df, cache_path
+                source = tmp_path
+            except Exception as e:
+                warnings.warn(f"Could not spool upload to disk: {e}. Parsing CSV directly.")
+                cache_path = None
+                uploaded_file.seek(0)
+                source = uploaded_file
+
+            df = DatabaseConnector.read_csv(source)
+            if df is not None and cache_path is not None:
+                try:
+                    df.to_parquet(cache_path, compression="zstd")
+                except Exception as e:
+                    warnings.warn(f"Could not write Parquet cache: {e}")
+                    cache_path = None
+            return df, cache_path if df is not None else None
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass # Best-effort temp cleanup
+
 # Example Usage (for testing)
 if __name__ == '__main__':
     # Add example connection details and test calls here
@@ -1,37 +1,30 @@
 import re
 import pandas as pd
-from dateutil.parser import parse
-from datetime import datetime
 
 # --- SSN Detection Logic ---
 
-# Pre-compiled regex for efficiency
-SSN_REGEX_HYPHEN = re.compile(r"^\d{3}-\d{2}-\d{4}$")
-SSN_REGEX_NO_HYPHEN = re.compile(r"^\d{9}$")
+# Pre-compiled regex for efficiency. Both accepted layouts live in one
+# alternation so the format check is a single vectorized str.match pass.
+SSN_REGEX = re.compile(r"^(?:\d{3}-\d{2}-\d{4}|\d{9})$")
 
 # Invalid Area Numbers (first 3 digits)
 INVALID_SSN_AREA = {"000", "666"} | set(str(i) for i in range(900, 1000))
 
-def _is_valid_ssn_logical(ssn_str: str) -> bool:
-    """Checks logical constraints for a structurally valid SSN string."""
-    if len(ssn_str) == 9:
-        area = ssn_str[0:3]
-        group = ssn_str[3:5]
-        serial = ssn_str[5:9]
-    elif len(ssn_str) == 11: # Format with hyphens
-        area = ssn_str[0:3]
-        group = ssn_str[4:6]
-        serial = ssn_str[7:11]
-    else:
-        return False # Should not happen if pre-validated
-
-    if area in INVALID_SSN_AREA:
-        return False
-    if group == "00":
-        return False
-    if serial == "0000":
-        return False
-    return True
+def _count_valid_ssn_logical(ssn_values: pd.Series) -> int:
+    """
+    Counts values passing the logical SSN constraints, vectorized.
+
+    Expects format-validated strings (with or without hyphens). Hyphens are
+    stripped once so area/group/serial come from fixed slices, and the three
+    constraint checks run as C-level mask operations instead of a Python
+    function call per value.
+    """
+    digits = ssn_values.str.replace("-", "", regex=False)
+    area = digits.str.slice(0, 3)
+    group = digits.str.slice(3, 5)
+    serial = digits.str.slice(5, 9)
+    valid = ~area.isin(INVALID_SSN_AREA) & group.ne("00") & serial.ne("0000")
+    return int(valid.sum())
 
 def check_ssn_candidate(series: pd.Series, sample_size: int = 100, format_threshold: float = 0.9, logical_threshold: float = 0.95) -> bool:
     """
@@ -53,17 +46,12 @@ def check_ssn_candidate(series: pd.Series, sample_size: int = 100, format_thresh
     # Sample data for performance
     sample = non_null_series.sample(n=min(sample_size, len(non_null_series)), random_state=42) # Use fixed random state for reproducibility
 
-    format_matches = 0
-    logical_passes = 0
-    format_matching_values = []
-
-    for value in sample:
-        is_format_match = False
-        cleaned_value = value.strip()
-        if SSN_REGEX_HYPHEN.match(cleaned_value) or SSN_REGEX_NO_HYPHEN.match(cleaned_value):
-            is_format_match = True
-            format_matches += 1
-            format_matching_values.append(cleaned_value)
+    # Vectorized format check: one C-level strip + regex match over the whole
+    # sample instead of two Python-level regex dispatches per value.
+    stripped = sample.str.strip()
+    format_mask = stripped.str.match(SSN_REGEX)
+    format_matches = int(format_mask.sum())
+    format_matching_values = stripped[format_mask]
 
     if format_matches == 0:
         return False
@@ -73,9 +61,7 @@ def check_ssn_candidate(series: pd.Series, sample_size: int = 100, format_thresh
         return False
 
     # Check logical constraints only on values that matched the format
-    for ssn_str in format_matching_values:
-        if _is_valid_ssn_logical(ssn_str):
-            logical_passes += 1
+    logical_passes = _count_valid_ssn_logical(format_matching_values)
 
     if format_matches > 0: # Avoid division by zero
         logical_pass_ratio = logical_passes / format_matches
@@ -87,17 +73,13 @@ def check_ssn_candidate(series: pd.Series, sample_size: int = 100, format_thresh
 
 # --- Date of Birth (DOB) Detection Logic ---
 
-DOB_NAME_KEYWORDS = {"dob", "birth", "date_of_birth", "birthday"}
+# Name-based gate for DOB detection: one compiled case-insensitive scan
+# instead of a Python loop of substring checks per candidate column.
+# ("birth" also covers "birthday" and "date_of_birth".)
+DOB_NAME_RE = re.compile(r"dob|birth", re.IGNORECASE)
 
-def _is_plausible_dob(dt: datetime) -> bool:
-    """Checks if a datetime object is a plausible DOB."""
-    now = datetime.now()
-    if dt > now: # Cannot be born in the future
-        return False
-    age = (now - dt).days / 365.25
-    if age < 0 or age > 120: # Plausible age range
-        return False
-    return True
+# Plausible age bound for a date of birth, in days
+MAX_DOB_AGE_DAYS = 120 * 365.25
 
 def check_dob_candidate(series: pd.Series, attribute_name: str, sample_size: int = 100, format_threshold: float = 0.9, logical_threshold: float = 0.95) -> bool:
     """
@@ -114,7 +96,7 @@ def check_dob_candidate(series: pd.Series, attribute_name: str, sample_size: int
         True if the series is a likely DOB candidate, False otherwise.
     """
     # 1. Name Check
-    if not any(keyword in attribute_name.lower() for keyword in DOB_NAME_KEYWORDS):
+    if DOB_NAME_RE.search(attribute_name) is None:
         return False # Skip if name doesn't suggest DOB
 
     non_null_series = series.dropna()
@@ -127,21 +109,13 @@ def check_dob_candidate(series: pd.Series, attribute_name: str, sample_size: int
     # Sample data for performance
     sample = str_series.sample(n=min(sample_size, len(str_series)), random_state=42)
 
-    parsed_dates = []
-    parse_success = 0
-    parse_attempts = 0
-
-    # 2. Format Check (using dateutil.parser for flexibility)
-    for value in sample:
-        parse_attempts += 1
-        try:
-            # Use fuzzy=False to avoid overly lenient parsing if needed, but start flexible
-            parsed_date = parse(value, fuzzy=False) 
-            parsed_dates.append(parsed_date)
-            parse_success += 1
-        except (ValueError, TypeError, OverflowError):
-            # Handle potential errors during parsing
-            pass 
+    # 2. Format Check — one vectorized parse for the whole sample. A dateutil
+    # parse() call per value (~50us each) dominated DOB detection wall time;
+    # pd.to_datetime dispatches to pandas' C-level parser and marks
+    # unparseable values NaT instead of raising per row.
+    parsed = pd.to_datetime(sample, errors='coerce', format='mixed')
+    parse_attempts = len(sample)
+    parse_success = int(parsed.notna().sum())
 
     if parse_attempts == 0: # Should not happen if non_null_series wasn't empty
         return False
@@ -150,11 +124,12 @@ def check_dob_candidate(series: pd.Series, attribute_name: str, sample_size: int
     if parse_success_ratio < format_threshold:
         return False
 
-    # 3. Logical Constraints
-    plausible_count = 0
-    for dt in parsed_dates:
-        if _is_plausible_dob(dt):
-            plausible_count += 1
+    # 3. Logical Constraints, as boolean mask ops over the parsed dates:
+    # not in the future, and within the plausible age range.
+    now = pd.Timestamp.now()
+    ages_days = (now - parsed).dt.days
+    plausible_mask = parsed.notna() & (parsed <= now) & (ages_days <= MAX_DOB_AGE_DAYS)
+    plausible_count = int(plausible_mask.sum())
 
     if parse_success > 0: # Avoid division by zero
         plausible_ratio = plausible_count / parse_success
@@ -1,6 +1,12 @@
+import math
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from src.pattern_detector import check_ssn_candidate, check_dob_candidate
 import warnings
 
@@ -15,95 +21,172 @@ DTYPE_MIXED = "MIXED" # Added for columns with multiple inferred types after coe
 # Quantiles to calculate for numeric types
 QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
 
+# Rows probed before committing to a full-column coercion in infer_dtype
+DTYPE_PROBE_SIZE = 200
+
+# Boolean-like string values and their truth mapping, hoisted to module
+# scope so neither inference nor the boolean branch rebuilds the dict per call
+BOOL_MAP = {'true': True, 'false': False, 'yes': True, 'no': False, '1': True, '0': False,
+            't': True, 'f': False, 'y': True, 'n': False}
+BOOL_LIKE_STRINGS = frozenset(BOOL_MAP)
+# Integer rendering of BOOL_MAP for the fused numpy mapping pass (-1 = unmapped)
+_BOOL_INT_MAP = {k: int(v) for k, v in BOOL_MAP.items()}
+
+
+def _map_booleans(values: np.ndarray) -> np.ndarray:
+    """
+    Maps raw bool-like values to an int8 array: 1/0 for mapped true/false,
+    -1 for values not in BOOL_MAP.
+
+    One pass over the array with a preallocated int8 output replaces the
+    four-step astype(str)/str.lower()/map/dropna pandas chain and its
+    per-step object-Series temporaries.
+    """
+    out = np.empty(len(values), dtype=np.int8)
+    get = _BOOL_INT_MAP.get
+    for i, v in enumerate(values):
+        key = v if isinstance(v, str) else str(v)
+        out[i] = get(key.lower(), -1)
+    return out
+
+# Cheap date-shape triage applied before the datetime parser in inference:
+# delimited numeric dates, compact yyyymmdd, month-name forms, and
+# time-of-day values (pandas parses bare times as datetimes too)
+_DATE_SHAPE_REGEX = re.compile(
+    r"\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}"   # 2024-01-31, 31/01/2024, 1.2.24
+    r"|\d{8}"                            # 20240131
+    r"|[A-Za-z]{3,9}\.?\s+\d{1,2}"       # Jan 31, January 31
+    r"|\d{1,2}[-/. ][A-Za-z]{3,9}"       # 31 Jan, 31-Jan-2024, 31.Jan.2024
+    r"|\d{1,2}:\d{2}"                    # 12:30, 12:30:45
+)
+
+# Minimum number of columns before profile_dataframe fans out to a process
+# pool; below this the pool startup cost outweighs the parallel win.
+PARALLEL_MIN_COLUMNS = 4
+
 def infer_dtype(series: pd.Series) -> str:
     """Infers the logical data type of a pandas Series, handling mixed types."""
-    # Drop NaNs for type inference, but keep original series for later checks
-    series_non_null = series.dropna()
+    return _infer_dtype_coerced(series, series.dropna())[0]
+
+
+def _infer_dtype_coerced(series: pd.Series, series_non_null: pd.Series):
+    """
+    Infers the logical dtype and returns any full-column coercions computed
+    along the way, so profile_attribute can reuse them instead of re-running
+    pd.to_numeric / pd.to_datetime over the same data.
+
+    Args:
+        series: The original Series (its dtype drives the direct checks).
+        series_non_null: The same Series with nulls dropped (the caller has
+                         usually computed this already).
+
+    Returns:
+        A tuple (dtype, numeric_coerced, datetime_coerced). The coerced
+        entries are non-null Series already converted to the target type, or
+        None when inference didn't need (or produce) the full conversion.
+    """
     if series_non_null.empty:
         # If all nulls, classify as unsupported
-        return DTYPE_UNSUPPORTED
+        return DTYPE_UNSUPPORTED, None, None
 
     original_dtype = series.dtype
 
     # --- Direct Type Checks ---
     if pd.api.types.is_bool_dtype(original_dtype):
-        return DTYPE_BOOLEAN
+        return DTYPE_BOOLEAN, None, None
     if pd.api.types.is_datetime64_any_dtype(original_dtype) or pd.api.types.is_timedelta64_dtype(original_dtype):
-        return DTYPE_DATETIME
+        # Already datetime-typed: the non-null values ARE the conversion
+        return DTYPE_DATETIME, None, series_non_null
     if pd.api.types.is_numeric_dtype(original_dtype) and not pd.api.types.is_bool_dtype(original_dtype):
          # Check if it looks like boolean despite numeric type (e.g., 0/1 int column)
          unique_vals = series_non_null.unique()
          if len(unique_vals) <= 2 and all(v in [0, 1] for v in unique_vals):
-             return DTYPE_BOOLEAN # Treat 0/1 integer columns as boolean
-         return DTYPE_NUMERIC
+             return DTYPE_BOOLEAN, None, None # Treat 0/1 integer columns as boolean
+         return DTYPE_NUMERIC, series_non_null, None
     if pd.api.types.is_string_dtype(original_dtype) or pd.api.types.is_categorical_dtype(original_dtype):
         # Try converting string types to numeric or datetime
         try:
             # Attempt numeric conversion first
-            pd.to_numeric(series_non_null, errors='raise')
+            numeric_coerced = pd.to_numeric(series_non_null, errors='raise')
             # If entirely convertible to numeric, classify as numeric
-            return DTYPE_NUMERIC
+            return DTYPE_NUMERIC, numeric_coerced, None
         except (ValueError, TypeError):
             # Not entirely numeric, try datetime
             try:
                 # Use a sample for performance check
                 sample_size = min(100, len(series_non_null))
                 sample = series_non_null.sample(sample_size, random_state=42) if sample_size > 0 else pd.Series(dtype=object)
-                if sample.empty: return DTYPE_STRING # Only nulls or empty strings
+                if sample.empty: return DTYPE_STRING, None, None # Only nulls or empty strings
+                # Shape triage first: a regex match is O(chars), while a
+                # failed to_datetime parse over the sample is far heavier.
+                # Only invoke the parser when most values even look date-like.
+                if sample.astype(str).str.match(_DATE_SHAPE_REGEX).mean() < 0.5:
+                    return DTYPE_STRING, None, None
                 pd.to_datetime(sample, errors='raise')
                 # If sample converts to datetime, tentatively classify as datetime
-                # More robust: check conversion percentage on full data if needed
-                # Let's assume if a sample parses, it's likely datetime for now
-                return DTYPE_DATETIME
+                # (only the sample was parsed, so no full conversion to return)
+                return DTYPE_DATETIME, None, None
             except (ValueError, TypeError, OverflowError):
                  # If not numeric or datetime, it's likely string
-                 return DTYPE_STRING
+                 return DTYPE_STRING, None, None
 
     # --- Handle Object Dtype (most complex) ---
     if original_dtype == object:
-        # Attempt conversions and see what sticks
-        numeric_coerced = pd.to_numeric(series_non_null, errors='coerce')
-        datetime_coerced = pd.to_datetime(series_non_null, errors='coerce')
-
-        not_na_numeric = numeric_coerced.notna()
-        not_na_datetime = datetime_coerced.notna()
-
-        all_numeric = not_na_numeric.all()
-        all_datetime = not_na_datetime.all()
-
-        if all_numeric:
-            # Check if it looks boolean (0/1)
-            unique_vals = numeric_coerced.dropna().unique()
-            if len(unique_vals) <= 2 and all(v in [0, 1] for v in unique_vals):
-                return DTYPE_BOOLEAN
-            return DTYPE_NUMERIC
-        if all_datetime:
-            return DTYPE_DATETIME
+        # Probe a fixed-size sample before paying for a full-column
+        # coercion: both to_numeric and to_datetime over all non-nulls are
+        # expensive, and a plainly-string column (the common case) is
+        # rejected from ~200 rows. The classification itself requires every
+        # value to convert, so a failed probe already decides the answer and
+        # escalating to the full column only happens on a clean probe.
+        probe = (series_non_null if len(series_non_null) <= DTYPE_PROBE_SIZE
+                 else series_non_null.sample(DTYPE_PROBE_SIZE, random_state=42))
+        probe_is_full = probe is series_non_null
+
+        probe_numeric = pd.to_numeric(probe, errors='coerce')
+        if bool(probe_numeric.notna().all()):
+            numeric_coerced = probe_numeric if probe_is_full else pd.to_numeric(series_non_null, errors='coerce')
+            if bool(numeric_coerced.notna().all()):
+                # Check if it looks boolean (0/1)
+                unique_vals = numeric_coerced.unique()
+                if len(unique_vals) <= 2 and all(v in [0, 1] for v in unique_vals):
+                    return DTYPE_BOOLEAN, None, None
+                return DTYPE_NUMERIC, numeric_coerced, None
+
+        probe_datetime = pd.to_datetime(probe, errors='coerce')
+        if bool(probe_datetime.notna().all()):
+            datetime_coerced = probe_datetime if probe_is_full else pd.to_datetime(series_non_null, errors='coerce')
+            if bool(datetime_coerced.notna().all()):
+                return DTYPE_DATETIME, None, datetime_coerced
 
         # Check for boolean-like strings ('True', 'False', 'Yes', 'No', etc.)
         try:
-            # Use a robust check for boolean-like values
-            bool_map = {'true': True, 'false': False, 'yes': True, 'no': False, '1': True, '0': False, 't': True, 'f': False, 'y': True, 'n': False}
-            # Check if ALL non-null values can be mapped
-            mapped_bools = series_non_null.astype(str).str.lower().map(bool_map)
-            if mapped_bools.notna().all(): # If all values map successfully to boolean
-                 return DTYPE_BOOLEAN
+            # Short-circuit on the first value outside the accepted set: most
+            # string columns fail on row one, where the previous
+            # astype(str).str.lower().map() materialized two full copies of
+            # the column before testing anything.
+            if all(str(v).lower() in BOOL_LIKE_STRINGS for v in series_non_null.to_numpy()):
+                 return DTYPE_BOOLEAN, None, None
         except Exception:
             pass # Ignore errors during bool check
 
         # Default to STRING if object and not clearly numeric/datetime/boolean
-        return DTYPE_STRING
+        return DTYPE_STRING, None, None
 
-    return DTYPE_UNSUPPORTED
+    return DTYPE_UNSUPPORTED, None, None
 
 
-def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[str, Any]]:
+def profile_attribute(series: pd.Series, attribute_name: str,
+                      null_count: Optional[int] = None,
+                      distinct_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
     Calculates profile metrics for a single pandas Series (attribute).
 
     Args:
         series: The pandas Series representing the attribute data.
         attribute_name: The name of the attribute.
+        null_count: Precomputed null count for the series, if the caller has
+                    already aggregated it frame-wide (see profile_dataframe).
+        distinct_count: Precomputed distinct (non-null) count, likewise.
 
     Returns:
         A dictionary containing the profile metrics, or None if type is unsupported.
@@ -120,13 +203,16 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
         return profile
 
     # --- Common Metrics ---
-    null_count = series.isnull().sum()
-    profile["null_count"] = int(null_count)
-    profile["null_percentage"] = (null_count / total_records) * 100 if total_records > 0 else 0.0
-
     non_null_series = series.dropna()
     non_null_count = len(non_null_series) # Count after dropping nulls
 
+    if null_count is None:
+        # Derived arithmetically from the dropna above — no second
+        # isnull().sum() pass over the column.
+        null_count = total_records - non_null_count
+    profile["null_count"] = int(null_count)
+    profile["null_percentage"] = (null_count / total_records) * 100 if total_records > 0 else 0.0
+
     if non_null_count == 0: # All values were null
         profile["data_type_detected"] = DTYPE_UNSUPPORTED
         profile["distinct_count"] = 0
@@ -134,34 +220,82 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
         profile["is_unique"] = True
         return profile
 
-    distinct_count = non_null_series.nunique()
+    # --- Type-Specific Metrics ---
+    # Inference runs before the distinct count so string columns can be
+    # hashed through Arrow below; it returns any full-column coercions it
+    # already computed, so the numeric/datetime branches don't redo them.
+    dtype, numeric_coerced, datetime_coerced = _infer_dtype_coerced(series, non_null_series)
+    profile["data_type_detected"] = dtype
+
+    # For string columns, cast to Arrow-backed strings once: nunique and
+    # value_counts then run on Arrow's C-level hash kernels instead of
+    # hashing a Python str object per element.
+    string_series = None
+    if dtype == DTYPE_STRING:
+        try:
+            string_series = non_null_series.astype('string[pyarrow]')
+        except (TypeError, ValueError, ImportError):
+            string_series = non_null_series.astype(str)
+
+    if distinct_count is None:
+        distinct_count = (string_series if string_series is not None else non_null_series).nunique()
     profile["distinct_count"] = int(distinct_count)
     profile["distinct_percentage"] = (distinct_count / non_null_count) * 100 if non_null_count > 0 else 0.0 # Avoid division by zero
     profile["is_unique"] = (distinct_count == non_null_count)
 
-    # --- Type-Specific Metrics ---
-    dtype = infer_dtype(series)
-    profile["data_type_detected"] = dtype
-
     # --- Numeric Profiling ---
     if dtype == DTYPE_NUMERIC:
         # Coerce to numeric, errors become NaN, then drop these NaNs
-        numeric_series = pd.to_numeric(non_null_series, errors='coerce').dropna()
+        if numeric_coerced is None:
+            numeric_coerced = pd.to_numeric(non_null_series, errors='coerce')
+        numeric_series = numeric_coerced.dropna()
         if not numeric_series.empty:
-            profile["min"] = float(numeric_series.min())
-            profile["max"] = float(numeric_series.max())
-            profile["mean"] = float(numeric_series.mean())
-            profile["median"] = float(numeric_series.median())
-            profile["std_dev"] = float(numeric_series.std()) if len(numeric_series) > 1 else 0.0 # Std needs > 1 point
-            profile["variance"] = float(numeric_series.var()) if len(numeric_series) > 1 else 0.0 # Var needs > 1 point
+            # Pull to a contiguous float64 array once, then derive
+            # min/max/mean/var/std from three reductions (min, max, sum plus
+            # a dot product) and all five quantiles (median included) from a
+            # single partial-sort call — instead of seven separate
+            # full-column pandas reductions, each its own memory pass.
+            arr = np.ascontiguousarray(numeric_series.to_numpy(dtype=np.float64, copy=False))
+            n = arr.size
+            mean = float(arr.sum()) / n
+            arr_min = float(arr.min())
+            arr_max = float(arr.max())
+            profile["min"] = arr_min
+            profile["max"] = arr_max
+            profile["mean"] = mean
+            if n > 1:
+                # Centre before squaring: the raw sum-of-squares form
+                # (dot(arr, arr)/n - mean**2) cancels catastrophically for
+                # large-offset data such as epoch millis, collapsing the
+                # variance to 0. One extra subtraction pass buys a stable
+                # result; max() still clamps float residue for constants.
+                centered = arr - mean
+                variance = max(0.0, float(np.dot(centered, centered)) / (n - 1))
+            else:
+                variance = 0.0 # Std/var need > 1 point
+            profile["std_dev"] = math.sqrt(variance)
+            profile["variance"] = variance
+            q_values = None
             try:
-                quantiles_dict = numeric_series.quantile(QUANTILES).to_dict()
-                profile["quantiles"] = {f"{int(q*100)}th": float(v) for q, v in quantiles_dict.items()}
+                q_values = np.quantile(arr, QUANTILES)
+                profile["median"] = float(q_values[QUANTILES.index(0.5)])
+                profile["quantiles"] = {f"{int(q*100)}th": float(v) for q, v in zip(QUANTILES, q_values)}
             except Exception as e:
                  warnings.warn(f"Could not compute quantiles for {attribute_name}: {e}")
+                 profile["median"] = float(np.median(arr))
                  profile["quantiles"] = {}
             try:
-                counts, bin_edges = np.histogram(numeric_series, bins='auto')
+                if q_values is not None and arr_max > arr_min:
+                    # Freedman–Diaconis bin count from the IQR computed
+                    # above: bins='auto' would re-partition the array for
+                    # the same percentiles, and range= skips histogram's
+                    # own min/max pass.
+                    iqr = float(q_values[QUANTILES.index(0.75)] - q_values[QUANTILES.index(0.25)])
+                    bin_width = 2.0 * iqr * n ** (-1.0 / 3.0) if iqr > 0 else (arr_max - arr_min) / 64
+                    n_bins = max(1, min(512, int(np.ceil((arr_max - arr_min) / bin_width))))
+                    counts, bin_edges = np.histogram(arr, bins=n_bins, range=(arr_min, arr_max))
+                else:
+                    counts, bin_edges = np.histogram(arr, bins='auto')
                 profile["histogram"] = {"counts": counts.tolist(), "bin_edges": bin_edges.tolist()}
             except Exception as e:
                 warnings.warn(f"Could not compute histogram for {attribute_name}: {e}")
@@ -169,8 +303,13 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
 
     # --- String Profiling ---
     elif dtype == DTYPE_STRING:
-        string_series = non_null_series.astype(str)
-        lengths = string_series.str.len()
+        # string_series was materialized (Arrow-backed when possible) before
+        # the distinct count above
+        # Length stats from one tight pass over the raw values: the .str
+        # accessor would allocate an intermediate Series and pay pandas
+        # dispatch per call, where fromiter fills a single int64 array.
+        string_values = string_series.to_numpy()
+        lengths = np.fromiter(map(len, string_values), dtype=np.int64, count=len(string_values))
         profile["min_length"] = int(lengths.min())
         profile["max_length"] = int(lengths.max())
         profile["avg_length"] = float(lengths.mean())
@@ -190,20 +329,32 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
             profile["top_1_frequency_pct"] = 0.0
             profile["top_5_frequency_pct"] = 0.0
         # Pattern detection on the original non-null series (before explicit string conversion)
-        profile["is_ssn_candidate"] = check_ssn_candidate(non_null_series)
+        # Cheap disqualifier first: SSNs are 9 chars (digits) or 11 (with
+        # hyphens), so when the length stats computed above show no value can
+        # fall in that band, skip the sampling/regex pass outright.
+        if profile["max_length"] >= 9 and profile["min_length"] <= 11:
+            profile["is_ssn_candidate"] = check_ssn_candidate(non_null_series)
+        else:
+            profile["is_ssn_candidate"] = False
         profile["is_dob_candidate"] = check_dob_candidate(non_null_series, attribute_name)
 
     # --- Datetime Profiling ---
     elif dtype == DTYPE_DATETIME:
          # Coerce to datetime, errors become NaT, then drop NaTs
-         datetime_series = pd.to_datetime(non_null_series, errors='coerce').dropna()
+         if datetime_coerced is None:
+             datetime_coerced = pd.to_datetime(non_null_series, errors='coerce')
+         datetime_series = datetime_coerced.dropna()
          if not datetime_series.empty:
-             profile["min_date"] = datetime_series.min().isoformat()
-             profile["max_date"] = datetime_series.max().isoformat()
+             # Reduce min/max once and reuse for the dates and the range,
+             # instead of re-running the reductions per metric
+             ts_min = datetime_series.min()
+             ts_max = datetime_series.max()
+             profile["min_date"] = ts_min.isoformat()
+             profile["max_date"] = ts_max.isoformat()
              try:
                  # Ensure both min and max are valid timestamps before calculating range
-                 if pd.notna(datetime_series.min()) and pd.notna(datetime_series.max()):
-                     time_range = datetime_series.max() - datetime_series.min()
+                 if pd.notna(ts_min) and pd.notna(ts_max):
+                     time_range = ts_max - ts_min
                      profile["time_range_days"] = float(time_range.total_seconds() / (24 * 3600))
                  else:
                      profile["time_range_days"] = None
@@ -211,11 +362,22 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
                  warnings.warn(f"Could not compute time range for {attribute_name} (mixed timezones?): {e}")
                  profile["time_range_days"] = None
              try:
-                 year_counts = datetime_series.dt.year.value_counts().sort_index()
-                 profile["histogram_by_year"] = {str(k): int(v) for k, v in year_counts.items()}
-             except Exception as e:
-                 warnings.warn(f"Could not compute year histogram for {attribute_name}: {e}")
-                 profile["histogram_by_year"] = None
+                 # Reinterpret the ns timestamps at year resolution: one
+                 # vectorized datetime64 cast plus np.unique (already sorted),
+                 # versus per-element field extraction through .dt.year
+                 years = (datetime_series.to_numpy(dtype='datetime64[ns]')
+                          .astype('datetime64[Y]').astype(np.int64) + 1970)
+                 unique_years, year_counts = np.unique(years, return_counts=True)
+                 profile["histogram_by_year"] = {str(int(y)): int(c) for y, c in zip(unique_years, year_counts)}
+             except Exception:
+                 # e.g. tz-aware values that don't cast cleanly; take the
+                 # accessor path rather than dropping the histogram
+                 try:
+                     year_counts = datetime_series.dt.year.value_counts().sort_index()
+                     profile["histogram_by_year"] = {str(k): int(v) for k, v in year_counts.items()}
+                 except Exception as e:
+                     warnings.warn(f"Could not compute year histogram for {attribute_name}: {e}")
+                     profile["histogram_by_year"] = None
 
     # --- Boolean Profiling ---
     elif dtype == DTYPE_BOOLEAN:
@@ -223,11 +385,11 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
         bool_series = None
         temp_series = non_null_series # Work on non-nulls
         if pd.api.types.is_string_dtype(temp_series.dtype) or temp_series.dtype == object:
-             bool_map = {'true': True, 'false': False, 'yes': True, 'no': False, '1': True, '0': False, 't': True, 'f': False, 'y': True, 'n': False}
-             # Map known bool strings, leave others as NaN
-             mapped_series = temp_series.astype(str).str.lower().map(bool_map)
-             # Only consider values that successfully mapped
-             bool_series = mapped_series.dropna().astype(bool)
+             # Single fused pass over the raw values (see _map_booleans)
+             # instead of the astype(str)/str.lower()/map/dropna chain, which
+             # allocated an intermediate object Series per step.
+             mapped = _map_booleans(temp_series.to_numpy())
+             bool_series = pd.Series(mapped[mapped >= 0].astype(bool))
         elif pd.api.types.is_numeric_dtype(temp_series.dtype):
              # Assume 0 is False, 1 is True for numeric -> bool if inferred as boolean
              unique_vals = temp_series.unique()
@@ -261,49 +423,253 @@ def profile_attribute(series: pd.Series, attribute_name: str) -> Optional[Dict[s
     return profile
 
 
-def profile_dataframe(df: pd.DataFrame, columns_to_profile: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+def profile_attribute_streaming(chunks_iter, attribute_name: str) -> Optional[Dict[str, Any]]:
     """
-    Profiles specified columns in a pandas DataFrame.
+    Calculates profile metrics from an iterator of Series chunks in one pass.
+
+    The single-pass metrics (counts, nulls, min/max, mean/std via chunk-merged
+    Welford accumulation, top values and distinct counts via a merged Counter,
+    date ranges) match profile_attribute; the metrics that inherently need the
+    full sample in memory (median, quantiles, histograms) are omitted. Use
+    this path when the sample is too large to hold at once — peak memory is
+    one chunk plus the value Counter.
+
+    Args:
+        chunks_iter: An iterator of pandas Series, one per chunk.
+        attribute_name: The name of the attribute.
+
+    Returns:
+        A dictionary of profile metrics, or None if no chunks were produced.
+    """
+    total_records = 0
+    null_count = 0
+    dtype = None
+    value_counter: Counter = Counter()
+    # Welford accumulators for the numeric path (chunk-level parallel merge)
+    num_n = 0
+    num_mean = 0.0
+    num_m2 = 0.0
+    num_min = num_max = None
+    # String lengths / datetime range accumulators
+    len_min = len_max = None
+    len_sum = 0
+    len_n = 0
+    date_min = date_max = None
+
+    for chunk in chunks_iter:
+        total_records += len(chunk)
+        null_count += int(chunk.isnull().sum())
+        non_null = chunk.dropna()
+        if non_null.empty:
+            continue
+        if dtype is None:
+            dtype = infer_dtype(chunk)
+        # The Counter doubles as the distinct-count structure and the top-k /
+        # boolean-frequency source; it grows with the distinct values seen,
+        # which is the bounded-memory tradeoff this path accepts.
+        value_counter.update({str(k): int(v) for k, v in non_null.value_counts().items()})
+
+        if dtype == DTYPE_NUMERIC:
+            numeric_chunk = pd.to_numeric(non_null, errors='coerce').dropna()
+            n_b = len(numeric_chunk)
+            if n_b > 0:
+                chunk_min = float(numeric_chunk.min())
+                chunk_max = float(numeric_chunk.max())
+                num_min = chunk_min if num_min is None else min(num_min, chunk_min)
+                num_max = chunk_max if num_max is None else max(num_max, chunk_max)
+                mean_b = float(numeric_chunk.mean())
+                m2_b = float(numeric_chunk.var(ddof=0)) * n_b if n_b > 1 else 0.0
+                delta = mean_b - num_mean
+                combined = num_n + n_b
+                num_m2 += m2_b + delta * delta * num_n * n_b / combined
+                num_mean += delta * n_b / combined
+                num_n = combined
+        elif dtype == DTYPE_STRING:
+            lengths = non_null.astype(str).str.len()
+            chunk_min = int(lengths.min())
+            chunk_max = int(lengths.max())
+            len_min = chunk_min if len_min is None else min(len_min, chunk_min)
+            len_max = chunk_max if len_max is None else max(len_max, chunk_max)
+            len_sum += int(lengths.sum())
+            len_n += len(lengths)
+        elif dtype == DTYPE_DATETIME:
+            datetime_chunk = pd.to_datetime(non_null, errors='coerce').dropna()
+            if not datetime_chunk.empty:
+                chunk_min = datetime_chunk.min()
+                chunk_max = datetime_chunk.max()
+                date_min = chunk_min if date_min is None else min(date_min, chunk_min)
+                date_max = chunk_max if date_max is None else max(date_max, chunk_max)
+
+    if total_records == 0:
+        return None
+
+    profile: Dict[str, Any] = {"attribute_name": attribute_name}
+    profile["total_records"] = total_records
+    profile["null_count"] = null_count
+    profile["null_percentage"] = (null_count / total_records) * 100
+    non_null_count = total_records - null_count
+    if non_null_count == 0:
+        profile["data_type_detected"] = DTYPE_UNSUPPORTED
+        profile["distinct_count"] = 0
+        profile["distinct_percentage"] = 0.0
+        profile["is_unique"] = True
+        return profile
+
+    distinct_count = len(value_counter)
+    profile["distinct_count"] = distinct_count
+    profile["distinct_percentage"] = (distinct_count / non_null_count) * 100
+    profile["is_unique"] = (distinct_count == non_null_count)
+    profile["data_type_detected"] = dtype
+
+    if dtype == DTYPE_NUMERIC and num_n > 0:
+        profile["min"] = num_min
+        profile["max"] = num_max
+        profile["mean"] = num_mean
+        profile["std_dev"] = math.sqrt(num_m2 / (num_n - 1)) if num_n > 1 else 0.0
+        profile["variance"] = num_m2 / (num_n - 1) if num_n > 1 else 0.0
+    elif dtype == DTYPE_STRING and len_n > 0:
+        profile["min_length"] = len_min
+        profile["max_length"] = len_max
+        profile["avg_length"] = len_sum / len_n
+        top = value_counter.most_common(10)
+        profile["top_values"] = {k: v for k, v in top}
+        profile["top_1_frequency_pct"] = (top[0][1] / non_null_count) * 100 if top else 0.0
+        profile["top_5_frequency_pct"] = (sum(v for _, v in top[:5]) / non_null_count) * 100 if top else 0.0
+    elif dtype == DTYPE_DATETIME and date_min is not None:
+        profile["min_date"] = date_min.isoformat()
+        profile["max_date"] = date_max.isoformat()
+        time_range = date_max - date_min
+        profile["time_range_days"] = float(time_range.total_seconds() / (24 * 3600))
+    elif dtype == DTYPE_BOOLEAN:
+        # BOOL_MAP plus the float renderings stringified bool/0-1 values take
+        bool_map = {**BOOL_MAP, '1.0': True, '0.0': False}
+        true_count = sum(v for k, v in value_counter.items() if bool_map.get(k.lower()) is True)
+        false_count = sum(v for k, v in value_counter.items() if bool_map.get(k.lower()) is False)
+        final_bool_count = true_count + false_count
+        profile["true_count"] = true_count
+        profile["false_count"] = false_count
+        profile["true_percentage"] = (true_count / final_bool_count) * 100 if final_bool_count > 0 else 0.0
+
+    return profile
+
+
+def _profile_column_safe(series: pd.Series, col_name: str, total_records: int,
+                         null_count: Optional[int] = None,
+                         distinct_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Profiles one column, converting failures into a basic error profile."""
+    try:
+        # No defensive copy: profiling only reads the Series — every
+        # coercion (to_numeric/to_datetime/astype) allocates a new object.
+        return profile_attribute(series, col_name, null_count=null_count, distinct_count=distinct_count)
+    except Exception as e:
+        warnings.warn(f"ERROR: Failed to profile column '{col_name}': {e}", UserWarning)
+        # Add a basic error profile
+        error_profile = {
+            "attribute_name": col_name,
+            "total_records": total_records,
+            "error": str(e)
+        }
+        # Try to add basic stats even if full profile failed
+        try:
+            error_profile["null_count"] = int(series.isnull().sum())
+            error_profile["null_percentage"] = (error_profile["null_count"] / total_records) * 100 if total_records > 0 else 0.0
+        except Exception:
+            pass # Ignore errors during error reporting
+        return error_profile
+
+
+def iter_profile_dataframe(df: pd.DataFrame, columns_to_profile: Optional[List[str]] = None, max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Profiles specified columns in a pandas DataFrame, yielding one profile
+    dict per column as it completes.
+
+    Columns are profiled independently, so when enough of them are requested
+    the work is fanned out across a process pool (one task per column) for a
+    near-linear speedup on the compute-bound stats. Yielding instead of
+    accumulating lets callers stream profiles straight to their sink (e.g.
+    JSON Lines) without holding every profile for a wide frame in memory,
+    and overlaps write I/O with the remaining column work.
 
     Args:
         df: The input DataFrame.
         columns_to_profile: A list of column names to profile. If None, profiles all columns.
+        max_workers: Worker process count for the parallel path. Defaults to
+                     os.cpu_count(); pass 1 to force sequential profiling.
 
-    Returns:
-        A list of dictionaries, where each dictionary contains the profile metrics for one attribute.
+    Yields:
+        A dictionary of profile metrics per attribute, in column order.
     """
     if columns_to_profile is None:
         columns_to_profile = df.columns.tolist()
 
-    all_profiles = []
+    present_columns = []
     for col_name in columns_to_profile:
         if col_name in df.columns:
-            print(f"Profiling column: {col_name}...")
-            try:
-                # Make a copy to avoid modifying original DataFrame during type inference/coercion
-                profile = profile_attribute(df[col_name].copy(), col_name)
-                if profile:
-                    all_profiles.append(profile)
-            except Exception as e:
-                 warnings.warn(f"ERROR: Failed to profile column '{col_name}': {e}", UserWarning)
-                 # Add a basic error profile
-                 error_profile = {
-                     "attribute_name": col_name,
-                     "total_records": len(df),
-                     "error": str(e)
-                 }
-                 # Try to add basic stats even if full profile failed
-                 try:
-                     error_profile["null_count"] = int(df[col_name].isnull().sum())
-                     error_profile["null_percentage"] = (error_profile["null_count"] / error_profile["total_records"]) * 100 if error_profile["total_records"] > 0 else 0.0
-                 except Exception:
-                     pass # Ignore errors during error reporting
-                 all_profiles.append(error_profile)
+            present_columns.append(col_name)
         else:
             warnings.warn(f"Column '{col_name}' not found in DataFrame. Skipping.")
 
+    total_records = len(df)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    # Pre-aggregate the common metrics frame-wide in two vectorized passes
+    # instead of one pass per column inside profile_attribute.
+    try:
+        null_counts = df[present_columns].isnull().sum()
+        distinct_counts = df[present_columns].nunique(dropna=True)
+    except Exception as e:
+        warnings.warn(f"Frame-wide pre-aggregation failed ({e}); falling back to per-column stats.")
+        null_counts = distinct_counts = None
+
+    def _precomputed(col_name):
+        if null_counts is None:
+            return None, None
+        return int(null_counts[col_name]), int(distinct_counts[col_name])
+
+    if max_workers > 1 and len(present_columns) >= PARALLEL_MIN_COLUMNS:
+        print(f"Profiling {len(present_columns)} columns across {max_workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Submit per column (each task pickles only its own Series) and
+            # collect in submission order to keep output deterministic.
+            futures = [
+                executor.submit(_profile_column_safe, df[col_name], col_name, total_records,
+                                *_precomputed(col_name))
+                for col_name in present_columns
+            ]
+            for future in futures:
+                profile = future.result()
+                if profile:
+                    yield profile
+    else:
+        for col_name in present_columns:
+            print(f"Profiling column: {col_name}...")
+            null_count, distinct_count = _precomputed(col_name)
+            profile = _profile_column_safe(df[col_name], col_name, total_records,
+                                           null_count=null_count, distinct_count=distinct_count)
+            if profile:
+                yield profile
+
     print("DataFrame profiling complete.")
-    return all_profiles
+
+
+def profile_dataframe(df: pd.DataFrame, columns_to_profile: Optional[List[str]] = None, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Profiles specified columns in a pandas DataFrame.
+
+    Thin wrapper over iter_profile_dataframe that materializes the profiles
+    as a list; use the iterator form directly when streaming profiles out.
+
+    Args:
+        df: The input DataFrame.
+        columns_to_profile: A list of column names to profile. If None, profiles all columns.
+        max_workers: Worker process count for the parallel path. Defaults to
+                     os.cpu_count(); pass 1 to force sequential profiling.
+
+    Returns:
+        A list of dictionaries, where each dictionary contains the profile metrics for one attribute.
+    """
+    return list(iter_profile_dataframe(df, columns_to_profile, max_workers=max_workers))
 
 # Example Usage (for testing purposes)
 # if __name__ == '__main__':
@@ -4,22 +4,34 @@ import sqlalchemy as sa
 from sqlalchemy.engine import Engine
 from sqlalchemy.schema import Table, MetaData, Column
 from sqlalchemy.types import String, Integer, Float, DateTime, Boolean, JSON, Text
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 # Note: Snowflake upsert might require MERGE, handled differently.
 # For simplicity, we might start with delete+insert or rely on specific dialects.
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
+import functools
 import warnings
 import json # For handling JSON serializable types before DB insertion
 
 # Define the default table name
 DEFAULT_RESULTS_TABLE_NAME = 'data_profiler_results'
+
+# Minimum batch size before the PostgreSQL save path switches from the
+# batched INSERT ... ON CONFLICT statement to COPY into a temp table plus a
+# single set-based upsert. COPY bypasses the per-row parse/plan path, but
+# only pays for its temp-table setup on larger payloads.
+COPY_MIN_ROWS = 1024
 # Define columns based on PROJECT_PLAN.md metrics
 # Need to handle potential variations and ensure types are DB-compatible
 # Using JSON or Text for complex types like quantiles/histograms/top_values
 def get_results_table_definition(table_name: str, metadata: MetaData) -> Table:
    """Creates the SQLAlchemy Table object for the results table."""
+   # On PostgreSQL store JSON columns as JSONB: binary storage skips the
+   # re-parse on every read of quantiles/histogram/top_values and leaves the
+   # door open for indexed key lookups. Other dialects keep generic JSON.
+   json_type = JSON().with_variant(JSONB(), 'postgresql')
    return Table(
        table_name, metadata,
        Column('attribute_name', String, primary_key=True), # Using unique identifier from app.py format
@@ -42,14 +54,14 @@ def get_results_table_definition(table_name: str, metadata: MetaData) -> Table:
        Column('median', Float, nullable=True),
        Column('std_dev', Float, nullable=True),
        Column('variance', Float, nullable=True),
-       Column('quantiles', JSON, nullable=True), # Store as JSON
-       Column('histogram', JSON, nullable=True), # Store as JSON
+       Column('quantiles', json_type, nullable=True), # Store as JSON
+       Column('histogram', json_type, nullable=True), # Store as JSON
 
        # String/Text Metrics
        Column('min_length', Integer, nullable=True),
        Column('max_length', Integer, nullable=True),
        Column('avg_length', Float, nullable=True),
-       Column('top_values', JSON, nullable=True), # Store as JSON
+       Column('top_values', json_type, nullable=True), # Store as JSON
        Column('is_ssn_candidate', Boolean, nullable=True),
        Column('is_dob_candidate', Boolean, nullable=True),
        Column('top_1_frequency_pct', Float, nullable=True),
@@ -59,7 +71,7 @@ def get_results_table_definition(table_name: str, metadata: MetaData) -> Table:
        Column('min_date', String, nullable=True), # Store ISO format string
        Column('max_date', String, nullable=True), # Store ISO format string
        Column('time_range_days', Float, nullable=True),
-       Column('histogram_by_year', JSON, nullable=True), # Store as JSON
+       Column('histogram_by_year', json_type, nullable=True), # Store as JSON
 
        # Boolean Metrics
        Column('true_count', Integer, nullable=True),
@@ -71,6 +83,17 @@ def get_results_table_definition(table_name: str, metadata: MetaData) -> Table:
    )
 
 
+# Table objects are interned per name: rebuilding ~30 Column objects on every
+# ResultsManager construction is wasted work, and SQLAlchemy refuses to define
+# the same table twice in one MetaData anyway. All cached tables share a
+# module-level MetaData.
+_SHARED_METADATA = MetaData()
+
+@functools.lru_cache(maxsize=None)
+def _results_table_for(table_name: str) -> Table:
+    return get_results_table_definition(table_name, _SHARED_METADATA)
+
+
 class ResultsManager:
     """Handles saving and retrieving profiling results from a database."""
 
@@ -85,39 +108,93 @@ class ResultsManager:
         if not isinstance(engine, Engine):
             raise TypeError("Engine must be a valid SQLAlchemy Engine object.")
         self.engine = engine
-        self.metadata = MetaData() # Each manager instance gets its own metadata
         self.table_name = table_name if table_name else DEFAULT_RESULTS_TABLE_NAME # Ensure table name is not empty
-        self.results_table = get_results_table_definition(self.table_name, self.metadata)
+        self.results_table = _results_table_for(self.table_name)
+        self.metadata = self.results_table.metadata
+        # Column-name tuples cached once: ColumnCollection iteration is not
+        # free, and save_profiles runs per batch. _expected_cols drives the
+        # vectorized reindex (profile_date and cluster_id are managed by the
+        # save/clustering paths themselves); _upsert_set_cols is the SET list
+        # for the ON CONFLICT and COPY upsert statements.
+        self._expected_cols = tuple(
+            c.name for c in self.results_table.columns
+            if c.name not in ('profile_date', 'cluster_id')
+        )
+        self._upsert_set_cols = tuple(
+            c.name for c in self.results_table.columns if c.name != 'attribute_name'
+        )
+        # The PostgreSQL upsert statement is identical across calls, so build
+        # it once; execute-time work is then just binding the batch, and
+        # SQLAlchemy's compiled-statement cache keys off this single object.
+        _stmt = pg_insert(self.results_table)
+        self._upsert_stmt = _stmt.on_conflict_do_update(
+            index_elements=['attribute_name'],
+            set_={name: _stmt.excluded[name] for name in self._upsert_set_cols}
+        )
+        self._validate_pool()
         self._ensure_table_exists()
 
+    def _validate_pool(self):
+        """
+        Warns when the engine has no connection pool.
+
+        Every save/retrieve/update here opens its own transaction, so with a
+        NullPool each call pays a full (re)connect — TCP/TLS handshake and
+        authentication for network databases. A pooled engine amortizes that
+        across the repeated save/update cycles a profiling run issues.
+        """
+        if self.engine.pool.__class__.__name__ == 'NullPool':
+            warnings.warn(
+                "Results engine uses NullPool: every save/read reconnects to the "
+                "database. Consider create_engine(..., pool_size=5, max_overflow=10, "
+                "pool_recycle=300, pool_pre_ping=True) to reuse connections.",
+                UserWarning
+            )
+
+    # Engine/table pairs whose existence check already ran this process;
+    # skips the redundant catalog round trip on repeat constructions.
+    _ensured: Set[Tuple[int, str]] = set()
+
     def _ensure_table_exists(self):
         """Creates the results table if it doesn't exist."""
+        ensure_key = (id(self.engine), self.table_name)
+        if ensure_key in self._ensured:
+            return
         try:
             print(f"Ensuring results table '{self.table_name}' exists...")
-            self.metadata.create_all(self.engine) # Use instance metadata
+            self.metadata.create_all(self.engine, tables=[self.results_table])
+            self._ensured.add(ensure_key)
             print(f"Table '{self.table_name}' check complete.")
         except SQLAlchemyError as e:
             warnings.warn(f"Error checking/creating results table: {e}", UserWarning)
             # Decide if this should be a fatal error
             raise
 
+    # Exact builtin types that pass through serialization untouched. Profile
+    # dicts are built with int()/float() conversions upstream, so nearly every
+    # field hits this set and skips the isinstance ladder and pd.isna call.
+    _PASSTHROUGH_TYPES = frozenset([str, int, bool, dict, list, datetime])
+
     def _serialize_complex_types(self, profile_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Ensure complex types (like numpy types) are JSON serializable."""
+        passthrough = self._PASSTHROUGH_TYPES
         serialized_data = []
         for record in profile_data:
             new_record = {}
             for key, value in record.items():
-                if isinstance(value, (np.integer, np.int64)):
-                    new_record[key] = int(value)
-                elif isinstance(value, (np.floating, np.float64)):
-                    new_record[key] = float(value)
+                value_type = type(value)
+                if value is None or value_type in passthrough:
+                    new_record[key] = value
+                elif value_type is float:
+                    # NaN (the only non-passthrough plain float) maps to NULL
+                    new_record[key] = value if value == value else None
+                elif isinstance(value, np.generic):
+                    # One check covers every numpy scalar (int64/float64/
+                    # bool_/datetime64); .item() is the C-level unboxing.
+                    new_record[key] = value.item()
                 elif isinstance(value, np.ndarray):
                     new_record[key] = value.tolist() # Convert numpy arrays
-                elif isinstance(value, (dict, list)):
-                     # Recursively check dicts/lists for numpy types? For now, assume top-level is enough
-                     # Or rely on JSON encoder to handle basic types within structures
-                     new_record[key] = value
-                elif pd.isna(value): # Handle Pandas NA or Numpy NaN
+                elif value is pd.NaT or value is pd.NA: # Identity checks, no pandas dispatch
                     new_record[key] = None
                 else:
                     new_record[key] = value
@@ -125,6 +202,61 @@ class ResultsManager:
         return serialized_data
 
 
+    def _copy_upsert_postgres(self, connection, records: List[Dict[str, Any]]):
+        """
+        Upserts a large batch via COPY FROM STDIN into a temp table.
+
+        Rows are streamed through psycopg2's copy_expert into a session-local
+        temp table, then folded into the results table with one set-based
+        INSERT ... ON CONFLICT DO UPDATE. COPY skips the per-row parse/plan
+        path entirely, which is where even the batched upsert spends its time
+        on payloads of thousands of rows. Runs inside the caller's
+        transaction; the temp table is dropped on commit.
+
+        Args:
+            connection: An open SQLAlchemy Connection (inside a transaction).
+            records: Serialized profile dicts matching the results schema.
+        """
+        import csv
+        import io
+
+        cols = ('attribute_name',) + tuple(c for c in self._upsert_set_cols if c != 'cluster_id')
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for record in records:
+            row = []
+            for col in cols:
+                value = record.get(col)
+                if value is None:
+                    row.append('')  # Unquoted empty field -> NULL (see COPY options)
+                elif isinstance(value, (dict, list)):
+                    row.append(json.dumps(value))
+                elif isinstance(value, bool):
+                    row.append('t' if value else 'f')
+                else:
+                    row.append(value)
+            writer.writerow(row)
+        buf.seek(0)
+
+        quoted_cols = ', '.join(f'"{c}"' for c in cols)
+        update_cols = ', '.join(f'"{c}" = EXCLUDED."{c}"' for c in cols if c != 'attribute_name')
+        cursor = connection.connection.cursor()  # Raw DBAPI (psycopg2) cursor
+        try:
+            cursor.execute(
+                f'CREATE TEMP TABLE tmp_profiles (LIKE "{self.table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                f"COPY tmp_profiles ({quoted_cols}) FROM STDIN WITH (FORMAT CSV, NULL '')",
+                buf,
+            )
+            cursor.execute(
+                f'INSERT INTO "{self.table_name}" ({quoted_cols}) '
+                f'SELECT {quoted_cols} FROM tmp_profiles '
+                f'ON CONFLICT (attribute_name) DO UPDATE SET {update_cols}'
+            )
+        finally:
+            cursor.close()
+
     def save_profiles(self, profile_data: List[Dict[str, Any]]):
         """
         Saves profiling results to the database, overwriting existing entries
@@ -140,14 +272,14 @@ class ResultsManager:
             return
 
         now = datetime.now()
-        prepared_data = []
-        for profile in profile_data:
-            # Ensure all expected columns are present, adding None if missing
-            record = {"profile_date": now}
-            for col in self.results_table.columns: # Use instance table object
-                if col.name not in ['profile_date', 'cluster_id']: # These are handled separately
-                     record[col.name] = profile.get(col.name) # Use .get() for safety
-            prepared_data.append(record)
+        # One reindex aligns every profile to the table schema in C (missing
+        # columns become NaN, extras are dropped), replacing the
+        # O(profiles x columns) Python loop of dict .get() calls; the
+        # notna mask then maps all NaN/NaT to None in a single pass.
+        frame = pd.DataFrame(profile_data).reindex(columns=self._expected_cols)
+        prepared_data = frame.astype(object).where(frame.notna(), None).to_dict('records')
+        for record in prepared_data:
+            record['profile_date'] = now
 
         # Ensure data is JSON serializable before inserting
         try:
@@ -160,20 +292,19 @@ class ResultsManager:
 
         try:
             with self.engine.begin() as connection: # Use transaction
-                if dialect_name == 'postgresql':
-                    # Use INSERT ... ON CONFLICT for PostgreSQL upsert
-                    for record in serializable_data:
-                        # Filter out None values if the dialect doesn't handle them well in JSON casts
-                        # record = {k: v for k, v in record.items() if v is not None}
-                        stmt = pg_insert(self.results_table).values(record) # Use instance table object
-                        # Define update statement for conflict
-                        update_dict = {col.name: col for col in stmt.excluded if col.name not in ['attribute_name']}
-                        stmt = stmt.on_conflict_do_update(
-                            index_elements=['attribute_name'], # Primary key column(s)
-                            set_=update_dict
-                        )
-                        connection.execute(stmt)
-                    print(f"Successfully upserted {len(serializable_data)} profiles using PostgreSQL ON CONFLICT.")
+                if dialect_name == 'postgresql' and len(serializable_data) >= COPY_MIN_ROWS:
+                    # Large payloads: COPY into a temp table, then one
+                    # set-based INSERT ... ON CONFLICT from it.
+                    self._copy_upsert_postgres(connection, serializable_data)
+                    print(f"Successfully upserted {len(serializable_data)} profiles using COPY + ON CONFLICT.")
+
+                elif dialect_name == 'postgresql':
+                    # INSERT ... ON CONFLICT upsert, executed with the whole
+                    # batch: SQLAlchemy's insertmanyvalues folds this into a
+                    # few multi-row statements instead of one round-trip per
+                    # profile. The statement itself is prebuilt in __init__.
+                    connection.execute(self._upsert_stmt, serializable_data)
+                    print(f"Successfully upserted {len(serializable_data)} profiles using batched PostgreSQL ON CONFLICT.")
 
                 # elif dialect_name == 'snowflake':
                     # Snowflake typically uses MERGE. Implementing MERGE via SQLAlchemy Core
@@ -187,6 +318,17 @@ class ResultsManager:
                     # connection.execute(self.results_table.insert(), serializable_data) # Use instance table
                     # print(f"Successfully saved {len(serializable_data)} profiles using DELETE+INSERT.")
 
+                elif dialect_name == 'sqlite':
+                    # Native sqlite upsert: one statement per batch instead of
+                    # DELETE+INSERT's two primary-key index scans.
+                    stmt = sqlite_insert(self.results_table)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=['attribute_name'],
+                        set_={name: stmt.excluded[name] for name in self._upsert_set_cols}
+                    )
+                    connection.execute(stmt, serializable_data)
+                    print(f"Successfully upserted {len(serializable_data)} profiles using sqlite ON CONFLICT.")
+
                 else: # Fallback: Delete then Insert (less efficient, not atomic)
                     warnings.warn(f"Using DELETE+INSERT fallback for dialect '{dialect_name}'. Consider implementing dialect-specific upsert.", UserWarning)
                     attribute_names = [record['attribute_name'] for record in serializable_data]
@@ -205,12 +347,68 @@ class ResultsManager:
             warnings.warn(f"Unexpected error saving profiles: {e}", UserWarning)
 
 
-    def get_all_profiles(self) -> pd.DataFrame:
-        """Retrieves all profiles from the results table into a DataFrame."""
+    def save_profiles_stream(self, profile_iter, chunk_size: int = 500) -> int:
+        """
+        Consumes an iterable of profile dicts, flushing to the database in
+        fixed-size batches. Peak memory stays bounded by the chunk size and
+        database writes overlap with whatever work produces the iterator.
+
+        Args:
+            profile_iter: Iterable (e.g. generator) yielding profile dicts.
+            chunk_size: Number of profiles per flush.
+
+        Returns:
+            The total number of profiles passed to save_profiles.
+        """
+        buffer: List[Dict[str, Any]] = []
+        saved = 0
+        for profile in profile_iter:
+            buffer.append(profile)
+            if len(buffer) >= chunk_size:
+                self.save_profiles(buffer)
+                saved += len(buffer)
+                buffer = []
+        if buffer:
+            self.save_profiles(buffer)
+            saved += len(buffer)
+        return saved
+
+    def get_all_profiles(self, columns: Optional[List[str]] = None,
+                         attribute_names: Optional[List[str]] = None,
+                         chunksize: Optional[int] = None) -> pd.DataFrame:
+        """
+        Retrieves profiles from the results table into a DataFrame.
+
+        By default this still returns every row and column, but callers that
+        only need a projection or a subset of attributes can say so and ship
+        proportionally fewer bytes instead of SELECT * over the full table.
+
+        Args:
+            columns: Optional column names to select; None selects all.
+            attribute_names: Optional attribute_name values to filter on.
+            chunksize: If set, rows are fetched and concatenated in chunks of
+                       this size so peak memory during the read stays bounded.
+
+        Returns:
+            A DataFrame of the matching profiles (empty on error).
+        """
         try:
-            query = sa.select(self.results_table) # Use instance table object
+            if columns:
+                query = sa.select(*[self.results_table.c[c] for c in columns])
+            else:
+                query = sa.select(self.results_table) # Use instance table object
+            if attribute_names:
+                query = query.where(self.results_table.c.attribute_name.in_(attribute_names))
             with self.engine.connect() as connection:
-                df = pd.read_sql(query, connection)
+                # Arrow-backed assembly: column buffers instead of a Python
+                # object per cell, matching the read path in
+                # DatabaseConnector.get_table_sample.
+                if chunksize:
+                    chunks = list(pd.read_sql(query, connection, chunksize=chunksize,
+                                              dtype_backend="pyarrow"))
+                    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+                else:
+                    df = pd.read_sql(query, connection, dtype_backend="pyarrow")
             print(f"Successfully retrieved {len(df)} profiles.")
             # Potentially deserialize JSON columns here if needed downstream
             return df
@@ -221,6 +419,46 @@ class ResultsManager:
             warnings.warn(f"Unexpected error retrieving profiles: {e}", UserWarning)
             return pd.DataFrame()
 
+    def bulk_update_cluster_ids(self, cluster_mapping: Dict[str, int]):
+        """
+        Updates cluster_ids for many attributes in one batched statement.
+
+        On PostgreSQL the whole mapping ships as a single UPDATE ... FROM
+        (VALUES ...) join — one statement, one plan, one round trip. Other
+        dialects (sqlite rejects the aliased-VALUES syntax) fall back to one
+        parameterized UPDATE executed with the batch (executemany), which
+        still collapses the per-attribute round trips into a single call.
+
+        Args:
+            cluster_mapping: Mapping of attribute_name -> cluster_id.
+        """
+        if not cluster_mapping:
+            return
+        try:
+            with self.engine.begin() as connection:
+                if self.engine.dialect.name == 'postgresql':
+                    v = sa.values(
+                        sa.column('name', String), sa.column('cid', Integer), name='v'
+                    ).data([(name, int(cid)) for name, cid in cluster_mapping.items()])
+                    stmt = self.results_table.update().values(
+                        cluster_id=v.c.cid
+                    ).where(self.results_table.c.attribute_name == v.c.name)
+                    connection.execute(stmt)
+                else:
+                    stmt = self.results_table.update().where(
+                        self.results_table.c.attribute_name == sa.bindparam('b_attribute_name')
+                    ).values(cluster_id=sa.bindparam('b_cluster_id'))
+                    params = [
+                        {'b_attribute_name': name, 'b_cluster_id': int(cluster_id)}
+                        for name, cluster_id in cluster_mapping.items()
+                    ]
+                    connection.execute(stmt, params)
+            print(f"Updated cluster IDs for {len(cluster_mapping)} attributes in one batch.")
+        except SQLAlchemyError as e:
+            warnings.warn(f"Database error bulk-updating cluster IDs: {e}", UserWarning)
+        except Exception as e:
+            warnings.warn(f"Unexpected error bulk-updating cluster IDs: {e}", UserWarning)
+
     def update_cluster_id(self, attribute_name: str, cluster_id: int):
          """Updates the cluster_id for a specific attribute identifier."""
          try:
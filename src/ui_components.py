@@ -1,89 +1,129 @@
+import uuid
+
 import streamlit as st
 import pandas as pd
+from functools import lru_cache
 from typing import Optional, Dict, Any, List, Tuple
 
 # Import DatabaseConnector for metadata fetching
 from src.database_connector import DatabaseConnector
+from src.config_manager import ConfigManager
 # Import helper functions from app.py (or move them here/to a utils file later)
 # For now, assume format_attribute_identifier and format_csv_attribute_identifier are available
 # or redefine them here if needed. Let's redefine for encapsulation.
 
+# The identifier helpers are pure string functions hit in loops (add-columns,
+# profiling dispatch) across reruns; lru_cache turns repeat calls for the same
+# attribute into dict lookups. Callers must treat the parsed dict as read-only.
+@lru_cache(maxsize=8192)
 def format_attribute_identifier(schema: Optional[str], table: str, column: str) -> str:
     """Formats a database attribute identifier."""
     schema_part = schema if schema else "__noschema__"
     return f"db::{schema_part}::{table}::{column}"
 
+@lru_cache(maxsize=8192)
 def format_csv_attribute_identifier(filename: str, column: str) -> str:
     """Formats a CSV attribute identifier."""
     return f"csv::{filename}::{column}"
 
+@lru_cache(maxsize=8192)
 def parse_attribute_identifier(identifier: str) -> Dict[str, Optional[str]]:
-   """Parses an identifier string back into components."""
-   parts = identifier.split('::')
-   if len(parts) == 3 and parts[0] == 'csv':
-       return {"type": "csv", "filename": parts[1], "column": parts[2]}
-   elif len(parts) == 4 and parts[0] == 'db':
-       schema = parts[1] if parts[1] != "__noschema__" else None
-       return {"type": "db", "schema": schema, "table": parts[2], "column": parts[3]}
-   else:
-        # Use warning inside streamlit app context if possible, otherwise print
-        try:
-            st.warning(f"Could not parse identifier: {identifier}")
-        except Exception:
-            print(f"Warning: Could not parse identifier: {identifier}")
-        return {"type": "unknown"}
+   """Parses an identifier string back into components.
+
+   Uses str.partition instead of split: no intermediate list allocation,
+   and each segment check is a cheap emptiness/containment test.
+   """
+   kind, sep0, rest = identifier.partition('::')
+   if kind == 'csv' and sep0:
+       filename, sep1, column = rest.partition('::')
+       if sep1 and '::' not in column:
+           return {"type": "csv", "filename": filename, "column": column}
+   elif kind == 'db' and sep0:
+       schema_part, sep1, rest2 = rest.partition('::')
+       table, sep2, column = rest2.partition('::')
+       if sep1 and sep2 and '::' not in column:
+           schema = schema_part if schema_part != "__noschema__" else None
+           return {"type": "db", "schema": schema, "table": table, "column": column}
+   # Use warning inside streamlit app context if possible, otherwise print
+   try:
+       st.warning(f"Could not parse identifier: {identifier}")
+   except Exception:
+       print(f"Warning: Could not parse identifier: {identifier}")
+   return {"type": "unknown"}
 
 
 def display_db_connection_form(
     config_key_prefix: str,
     db_types: List[str] = ["postgresql", "snowflake"],
     defaults: Optional[Dict[str, Any]] = None,
-    disabled: bool = False
+    disabled: bool = False,
+    db_type: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Displays form elements for database connection details.
-    """
-    if defaults is None:
-        defaults = {}
 
-    db_type = st.selectbox(
-        "Database Type",
-        db_types,
-        key=f"{config_key_prefix}_db_type",
-        index=db_types.index(defaults.get("db_type", db_types[0])),
-        disabled=disabled
-    )
+    When db_type is provided the type selectbox is not rendered; this lets
+    callers place the selector outside an st.form (it controls which fields
+    appear, so it must rerun immediately) while the credential fields are
+    batched inside the form.
+    """
+    # Local default lookup bound once; this renders on every Streamlit rerun.
+    _get = (defaults or {}).get
+
+    if db_type is None:
+        default_type = _get("db_type", db_types[0])
+        db_type = st.selectbox(
+            "Database Type",
+            db_types,
+            key=f"{config_key_prefix}_db_type",
+            index=db_types.index(default_type) if default_type in db_types else 0,
+            disabled=disabled
+        )
 
     conn_details: Dict[str, Any] = {"db_type": db_type}
 
     if db_type == "postgresql":
         conn_details.update({
-            "host": st.text_input("Host", key=f"{config_key_prefix}_pg_host", value=defaults.get("host", ""), disabled=disabled),
-            "port": st.number_input("Port", value=defaults.get("port", 5432), key=f"{config_key_prefix}_pg_port", disabled=disabled),
-            "username": st.text_input("Username", key=f"{config_key_prefix}_pg_user", value=defaults.get("username", ""), disabled=disabled),
-            "password": st.text_input("Password", type="password", key=f"{config_key_prefix}_pg_pass", value=defaults.get("password", ""), disabled=disabled),
-            "database": st.text_input("Database", key=f"{config_key_prefix}_pg_db", value=defaults.get("database", ""), disabled=disabled),
+            "host": st.text_input("Host", key=f"{config_key_prefix}_pg_host", value=_get("host", ""), disabled=disabled),
+            "port": st.number_input("Port", value=_get("port", 5432), key=f"{config_key_prefix}_pg_port", disabled=disabled),
+            "username": st.text_input("Username", key=f"{config_key_prefix}_pg_user", value=_get("username", ""), disabled=disabled),
+            "password": st.text_input("Password", type="password", key=f"{config_key_prefix}_pg_pass", value=_get("password", ""), disabled=disabled),
+            "database": st.text_input("Database", key=f"{config_key_prefix}_pg_db", value=_get("database", ""), disabled=disabled),
         })
     elif db_type == "snowflake":
          conn_details.update({
-            "account": st.text_input("Account", key=f"{config_key_prefix}_sf_account", value=defaults.get("account", ""), disabled=disabled),
-            "username": st.text_input("Username", key=f"{config_key_prefix}_sf_user", value=defaults.get("username", ""), disabled=disabled),
-            "password": st.text_input("Password", type="password", key=f"{config_key_prefix}_sf_pass", value=defaults.get("password", ""), disabled=disabled),
-            "warehouse": st.text_input("Warehouse", key=f"{config_key_prefix}_sf_wh", value=defaults.get("warehouse", ""), disabled=disabled),
-            "database": st.text_input("Database", key=f"{config_key_prefix}_sf_db", value=defaults.get("database", ""), disabled=disabled),
-            "schema": st.text_input("Schema", key=f"{config_key_prefix}_sf_schema", value=defaults.get("schema", ""), disabled=disabled),
-            "role": st.text_input("Role (Optional)", key=f"{config_key_prefix}_sf_role", value=defaults.get("role", ""), disabled=disabled),
+            "account": st.text_input("Account", key=f"{config_key_prefix}_sf_account", value=_get("account", ""), disabled=disabled),
+            "username": st.text_input("Username", key=f"{config_key_prefix}_sf_user", value=_get("username", ""), disabled=disabled),
+            "password": st.text_input("Password", type="password", key=f"{config_key_prefix}_sf_pass", value=_get("password", ""), disabled=disabled),
+            "warehouse": st.text_input("Warehouse", key=f"{config_key_prefix}_sf_wh", value=_get("warehouse", ""), disabled=disabled),
+            "database": st.text_input("Database", key=f"{config_key_prefix}_sf_db", value=_get("database", ""), disabled=disabled),
+            "schema": st.text_input("Schema", key=f"{config_key_prefix}_sf_schema", value=_get("schema", ""), disabled=disabled),
+            "role": st.text_input("Role (Optional)", key=f"{config_key_prefix}_sf_role", value=_get("role", ""), disabled=disabled),
         })
 
     return conn_details
 
 
+@st.cache_resource(show_spinner=False)
+def _get_config_manager() -> ConfigManager:
+    """One ConfigManager shared across reruns; the class itself is stateless."""
+    return ConfigManager()
+
+
 def display_results_config_ui(
     source_conn_details: Optional[Dict[str, Any]],
     source_is_db: bool
-) -> Tuple[Optional[Dict[str, Any]], str]:
+) -> Tuple[Optional[Dict[str, Any]], str, bool]:
     """
     Displays UI for configuring results database connection and table name.
+
+    The credential fields are batched in an st.form so typing in them does
+    not rerun the whole script; only the submit click does. The checkbox and
+    database-type selector stay outside the form because they change which
+    fields render and must take effect immediately.
+
+    Returns:
+        A tuple of (connection details, table name, submit clicked).
     """
     st.subheader("2. Results Storage (Database)")
 
@@ -95,9 +135,10 @@ def display_results_config_ui(
     )
 
     results_disabled = use_same_db and source_is_db
-    # Load saved results connection details if not using source details
-    from src.config_manager import ConfigManager # Add import inside function for encapsulation
-    config_manager_ui = ConfigManager()
+    # Load saved results connection details if not using source details.
+    # ConfigManager holds no per-instance state (it reads/writes session
+    # state), so one shared instance serves every rerun.
+    config_manager_ui = _get_config_manager()
     if results_disabled:
         defaults = source_conn_details if source_conn_details else {} # Use source if checked and available
     else:
@@ -107,62 +148,147 @@ def display_results_config_ui(
 
     saved_table_name = config_manager_ui.load_results_table_name() # Load saved table name regardless
 
-    results_table_name = st.text_input(
-        "Results Table Name",
-        value=saved_table_name, # Use value loaded via ConfigManager
-        key="results_table_name_input",
-    )
-
-    conn_details_results = display_db_connection_form(
-        config_key_prefix="res",
-        db_types=["postgresql", "snowflake"],
-        defaults=defaults,
+    res_db_types = ["postgresql", "snowflake"]
+    res_db_type = st.selectbox(
+        "Database Type",
+        res_db_types,
+        key="res_db_type",
+        index=res_db_types.index(defaults.get("db_type", res_db_types[0])),
         disabled=results_disabled
     )
 
+    with st.form("res_conn_form"):
+        results_table_name = st.text_input(
+            "Results Table Name",
+            value=saved_table_name, # Use value loaded via ConfigManager
+            key="results_table_name_input",
+        )
+
+        conn_details_results = display_db_connection_form(
+            config_key_prefix="res",
+            db_types=res_db_types,
+            defaults=defaults,
+            disabled=results_disabled,
+            db_type=res_db_type
+        )
+
+        submitted = st.form_submit_button("Connect to Results DB")
+
     if results_disabled and source_conn_details:
-        conn_details_to_use = source_conn_details.copy()
+        # Copy only when the db_type override actually differs; in the common
+        # case every rerun can hand back the source dict untouched.
+        conn_details_to_use = source_conn_details
         if conn_details_results:
-             conn_details_to_use["db_type"] = conn_details_results.get("db_type", source_conn_details.get("db_type"))
+            db_type_override = conn_details_results.get("db_type", source_conn_details.get("db_type"))
+            if db_type_override != source_conn_details.get("db_type"):
+                conn_details_to_use = {**source_conn_details, "db_type": db_type_override}
     else:
         conn_details_to_use = conn_details_results
 
-    return conn_details_to_use, results_table_name
+    return conn_details_to_use, results_table_name, submitted
+
+
+# --- Cached Metadata Lookups ---
+# Streamlit reruns the whole script on every widget interaction, so the raw
+# DatabaseConnector.get_* calls would round-trip to the database on each rerun.
+# These wrappers memoize the metadata for a few minutes. The engine argument is
+# prefixed with '_' so Streamlit skips hashing it (Engine objects are not
+# hashable); the stable 'engine_key' (render of the connection URL) keys the cache instead.
+
+def _engine_cache_key(engine) -> str:
+    """Returns a stable, hashable cache key for a SQLAlchemy engine."""
+    return str(engine.url)
+
+
+def _session_cache_token() -> str:
+    """
+    Returns a token unique to this browser session.
+
+    st.cache_data is shared across all sessions, so caches keyed only by
+    session-local counters (like profiles_version, which starts at 0
+    everywhere) would collide between users. Including this token scopes
+    such entries to the session that produced them.
+    """
+    token = st.session_state.get("_cache_token")
+    if token is None:
+        token = uuid.uuid4().hex
+        st.session_state["_cache_token"] = token
+    return token
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_schemas(_engine, engine_key: str) -> List[str]:
+    """Cached wrapper around DatabaseConnector.get_schemas."""
+    return DatabaseConnector.get_schemas(_engine)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_tables(_engine, engine_key: str, schema: Optional[str]) -> List[str]:
+    """Cached wrapper around DatabaseConnector.get_tables."""
+    return DatabaseConnector.get_tables(_engine, schema)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_columns(_engine, engine_key: str, table_name: str, schema: Optional[str]) -> List[Dict[str, Any]]:
+    """Cached wrapper around DatabaseConnector.get_columns."""
+    return DatabaseConnector.get_columns(_engine, table_name, schema)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_all_tables(_engine, engine_key: str, schemas: Tuple[str, ...]) -> Dict[str, List[str]]:
+    """Cached wrapper around DatabaseConnector.get_all_tables (parallel fetch)."""
+    return DatabaseConnector.get_all_tables(_engine, list(schemas))
 
 
 # --- Attribute Selection UI ---
+@st.fragment
 def display_attribute_selection():
-    """Displays UI for selecting attributes from DB or CSV."""
+    """
+    Displays UI for selecting attributes from DB or CSV.
+
+    Runs as a fragment: schema/table/column widget interactions rerun only
+    this section instead of the whole script. Adding columns mutates state
+    that app.py renders further down, so the add handlers request an
+    app-scoped rerun (with the success message carried over as a flash).
+    """
     st.header("⬇️ Select Attributes for Profiling")
+    flash = st.session_state.pop("_add_columns_flash", None)
+    if flash:
+        st.success(flash)
     selected_schema = None
     selected_table = None
     selected_columns_in_table = []
 
     if st.session_state.source_type == "database" and st.session_state.db_engine:
         try:
-            schemas = DatabaseConnector.get_schemas(st.session_state.db_engine)
+            engine = st.session_state.db_engine
+            engine_key = _engine_cache_key(engine)
+            schemas = _cached_get_schemas(engine, engine_key)
             if schemas:
                 selected_schema = st.selectbox("Select Schema", schemas, key="schema_select")
                 if selected_schema:
-                    tables = DatabaseConnector.get_tables(st.session_state.db_engine, selected_schema)
+                    # One parallel fetch covers every schema, so switching the
+                    # schema selectbox afterwards costs no DB round trip.
+                    tables_by_schema = _cached_get_all_tables(engine, engine_key, tuple(schemas))
+                    tables = tables_by_schema.get(selected_schema, [])
                     if tables:
                         selected_table = st.selectbox("Select Table", tables, key="table_select")
                         if selected_table:
-                             columns_info = DatabaseConnector.get_columns(st.session_state.db_engine, selected_table, selected_schema)
+                             columns_info = _cached_get_columns(engine, engine_key, selected_table, selected_schema)
                              all_columns = [c['name'] for c in columns_info]
                              selected_columns_in_table = st.multiselect("Select Columns", all_columns, key=f"col_select_{selected_schema}_{selected_table}")
 
                              if st.button("Add Columns to List", key=f"add_cols_{selected_schema}_{selected_table}"):
                                  added_count = 0 # Initialize count for DB button click
                                  columns_to_add = all_columns if not selected_columns_in_table else selected_columns_in_table
+                                 # Schema/table never vary inside the loop, so
+                                 # build the identifier prefix once instead of
+                                 # re-formatting it per column.
+                                 prefix = format_attribute_identifier(selected_schema, selected_table, "")
                                  for col in columns_to_add:
-                                     identifier = format_attribute_identifier(selected_schema, selected_table, col)
+                                     identifier = prefix + col
                                      if identifier not in st.session_state.attributes_to_profile:
-                                         st.session_state.attributes_to_profile.append(identifier)
+                                         st.session_state.attributes_to_profile[identifier] = None # Dict used as ordered set
                                          added_count += 1
                                  if added_count > 0:
-                                     st.success(f"Added {added_count} attribute(s) from '{selected_table}' to the profiling list.")
-                                     # st.rerun() # Keep commented out
+                                     st.session_state["_add_columns_flash"] = f"Added {added_count} attribute(s) from '{selected_table}' to the profiling list."
+                                     st.rerun(scope="app") # Refresh the profiling list rendered outside this fragment
                                  elif columns_to_add:
                                      st.info("Selected attribute(s) already in the list.")
                     else:
@@ -174,7 +300,12 @@ def display_attribute_selection():
             st.error(f"Error interacting with source database: {e}")
 
     elif st.session_state.source_type == "csv" and st.session_state.csv_df is not None:
-        st.dataframe(st.session_state.csv_df.head())
+        # Collapsed by default so the preview rows aren't re-serialized to the
+        # frontend on every rerun; the head is pre-converted to Arrow once at
+        # upload time so rendering skips the per-rerun pandas->Arrow pass.
+        with st.expander("Preview CSV (first rows)", expanded=False):
+            preview = st.session_state.get("csv_head_arrow")
+            st.dataframe(preview if preview is not None else st.session_state.csv_df.head())
         all_columns = st.session_state.csv_df.columns.tolist()
         selected_columns_in_table = st.multiselect("Select Columns", all_columns, key="col_select_csv")
 
@@ -182,14 +313,15 @@ def display_attribute_selection():
             added_count = 0 # Initialize count for CSV button click
             filename = st.session_state.csv_filename
             columns_to_add = all_columns if not selected_columns_in_table else selected_columns_in_table
+            prefix = format_csv_attribute_identifier(filename, "")
             for col in columns_to_add:
-                identifier = format_csv_attribute_identifier(filename, col)
+                identifier = prefix + col
                 if identifier not in st.session_state.attributes_to_profile:
-                    st.session_state.attributes_to_profile.append(identifier)
+                    st.session_state.attributes_to_profile[identifier] = None # Dict used as ordered set
                     added_count += 1
             if added_count > 0:
-                st.success(f"Added {added_count} attribute(s) from '{filename}' to the profiling list.")
-                # st.rerun() # Keep commented out
+                st.session_state["_add_columns_flash"] = f"Added {added_count} attribute(s) from '{filename}' to the profiling list."
+                st.rerun(scope="app") # Refresh the profiling list rendered outside this fragment
             elif columns_to_add:
                 st.info("Selected attribute(s) already in the list.")
             else: # Handle case where columns_to_add might be empty
@@ -199,25 +331,69 @@ def display_attribute_selection():
 
 
 # --- Profiling Results Display ---
+# Above this many profiles the results table is paginated: st.dataframe ships
+# the whole frame to the browser per render, so only the visible page goes out.
+RESULTS_PAGE_ROWS = 200
+
+
+def _paginated_dataframe(df: pd.DataFrame, widget_key: str):
+    """Renders df via st.dataframe, paginating once it outgrows one page."""
+    total = len(df)
+    if total <= RESULTS_PAGE_ROWS:
+        st.dataframe(df)
+        return
+    max_pages = -(-total // RESULTS_PAGE_ROWS)
+    page = st.number_input("Page", min_value=1, max_value=max_pages, value=1, key=widget_key)
+    start = (page - 1) * RESULTS_PAGE_ROWS
+    st.caption(f"Rows {start + 1}-{min(start + RESULTS_PAGE_ROWS, total)} of {total}")
+    st.dataframe(df.iloc[start:start + RESULTS_PAGE_ROWS])
+@st.cache_data(show_spinner=False)
+def _success_profiles_frame(_profiled_data: List[Dict[str, Any]], cache_key: str) -> pd.DataFrame:
+    """
+    Builds (and caches) the success-only results frame shown after a run.
+
+    The profile list itself is passed as an underscore argument so
+    st.cache_data doesn't hash hundreds of nested dicts on every rerun; the
+    session token plus profiles_version counter key the cache instead and
+    change exactly when this session completes a profiling run. from_records
+    consumes the filtering generator without an intermediate list.
+    """
+    return pd.DataFrame.from_records(p for p in _profiled_data if 'error' not in p)
+
+
+@st.fragment
 def display_profiling_results():
     """Displays the results from the last profiling run."""
     st.header("🔍 Profiling Results (Last Run)")
-    if st.session_state.profiled_data:
-        # Display only successful profiles here
-        success_profiles_df = pd.DataFrame([p for p in st.session_state.profiled_data if 'error' not in p])
-        if not success_profiles_df.empty:
-            st.dataframe(success_profiles_df)
-        else:
-            # Check if there were only errors
-            if any('error' in p for p in st.session_state.profiled_data):
-                 st.warning("Profiling ran, but all selected attributes resulted in errors.")
-            else: # Should not happen if profiled_data is not None/empty, but good fallback
-                 st.info("No attributes were successfully profiled in the last run.")
+    # Counts are maintained when the profiling job stores its results, so
+    # deciding what to render costs two session-state lookups instead of
+    # scanning the profile list on every rerun.
+    if st.session_state.get("profile_success_count", 0) and st.session_state.profiled_data:
+        success_profiles_df = _success_profiles_frame(
+            st.session_state.profiled_data,
+            f"{_session_cache_token()}::{st.session_state.get('profiles_version', 0)}",
+        )
+        _paginated_dataframe(success_profiles_df, "profile_results_page")
+    elif st.session_state.get("profile_error_count", 0):
+        st.warning("Profiling ran, but all selected attributes resulted in errors.")
     else:
         st.info("Run profiling to see results here.")
 
 
 # --- Clustering Results Display ---
+@st.cache_data(show_spinner=False)
+def _all_profiles_frame(_results_manager, cache_key: str) -> pd.DataFrame:
+    """
+    Cached fetch of the stored profiles table. The cache key carries the
+    manager identity plus the session token and profiles_version counter, so
+    the frame is only refetched after a profiling run saves new results - not
+    on every rerun or after every clustering pass - and entries from other
+    sessions (whose version counters also start at 0) never alias this one.
+    """
+    return _results_manager.get_all_profiles()
+
+
+@st.fragment
 def display_clustering_results():
     """Displays the results from the last clustering run."""
     st.header("🔗 Clustering Analysis")
@@ -233,11 +409,27 @@ def display_clustering_results():
             st.dataframe(st.session_state.cluster_results)
             # Optionally show updated full profiles table from DB
             with st.expander("View Full Profiles with Cluster IDs"):
-                try:
-                    all_profiles_df = st.session_state.results_manager.get_all_profiles()
-                    st.dataframe(all_profiles_df)
-                except Exception as e:
-                    st.error(f"Could not retrieve full profiles: {e}")
+                # An expander's body still executes while collapsed, so gate
+                # the table fetch behind an explicit opt-in; until the box is
+                # ticked no query (not even the first, uncached one) fires.
+                if st.checkbox("Load full profiles", key="show_full_profiles_cb"):
+                    try:
+                        results_manager = st.session_state.results_manager
+                        cache_key = (f"{results_manager.engine.url}::{results_manager.table_name}"
+                                     f"::{_session_cache_token()}::{st.session_state.get('profiles_version', 0)}")
+                        all_profiles_df = _all_profiles_frame(results_manager, cache_key)
+                        cluster_df = st.session_state.cluster_results
+                        if 'attribute_name' in all_profiles_df.columns:
+                            # Merge the fresh cluster IDs client-side rather than
+                            # re-reading the whole table after each clustering run
+                            all_profiles_df = all_profiles_df.drop(columns=['cluster_id'], errors='ignore').merge(
+                                cluster_df[['attribute_name', 'cluster_id']], on='attribute_name', how='left'
+                            )
+                        _paginated_dataframe(all_profiles_df, "full_profiles_page")
+                    except Exception as e:
+                        st.error(f"Could not retrieve full profiles: {e}")
+                else:
+                    st.caption("Tick to load the stored profiles table.")
         # else: # No previous results to show
             # st.info("Run clustering to see results.") # Covered by the outer else
     else: